@@ -15,6 +15,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"
 from utils.paths import get_path  # Import the get_path function from paths.py
 import utils.constants as constants
 import utils.functions as functions
+import utils.loaders as loaders
 
 import pandas as pd
 import geopandas as gpd
@@ -31,27 +32,22 @@ def main():
     emdat_data_path = get_path("emdat_path")
     print(f"EM-DAT Data Path: {emdat_data_path}")
 
-    # Load EM-DAT using pandas
+    # Load EM-DAT (from the Parquet cache)
     if os.path.exists(emdat_data_path):
-        emdat = pd.read_excel(emdat_data_path)
+        emdat = loaders.read_emdat().reset_index()
         print(emdat.head())
     else:
         print(f"File not found at {emdat_data_path}")
 
     emdat["Location"] = emdat["Location"].str.lower()
 
-    emdat.loc[emdat.ISO == "PHL", "Location"] = emdat.loc[
-        emdat.ISO == "PHL", "Location"
-    ].replace(constants.rep_philippines, regex=True)
-    emdat.loc[emdat.ISO == "BFA", "Location"] = emdat.loc[
-        emdat.ISO == "BFA", "Location"
-    ].replace(constants.rep_burkina, regex=True)
-    emdat.loc[emdat.ISO == "HTI", "Location"] = emdat.loc[
-        emdat.ISO == "HTI", "Location"
-    ].replace(constants.rep_haiti, regex=True)
-    emdat.loc[emdat.ISO == "TCD", "Location"] = emdat.loc[
-        emdat.ISO == "TCD", "Location"
-    ].replace(constants.rep_chad, regex=True)
+    # correct the region names of some countries, in one pass per country
+    for iso, replacements in constants.rep_countries.items():
+        country = emdat.ISO == iso
+        emdat.loc[country, "Location"] = functions.apply_replacements(
+            emdat.loc[country, "Location"],
+            functions.compile_replacements(replacements),
+        )
 
     Emdata = emdat.copy()
 
@@ -81,95 +77,89 @@ def main():
 
     # The final DataFrame presents a standardized and cleaned version of the original location data, making it suitable for further analysis or geocoding operations.
 
-    Emdata_loconly.loc[:, "Location"] = Emdata_loconly["Location"].str.replace(
-        r"\) and\b", "),", regex=True
-    )
-
-    Emdata_loconly.loc[:, "Location"] = Emdata_loconly["Location"].str.replace(
-        r"\b(and|Between|&|\+)\b", ",", regex=True
+    Emdata_loconly.loc[:, "Location"] = functions.apply_replacements(
+        Emdata_loconly["Location"],
+        functions.compile_replacements(
+            {r"\) and\b": "),", r"\b(and|Between|&|\+)\b": ","}
+        ),
     )
 
     # 3 Split and Parse Location Strings
     ######################################
 
-    expanded_rows = [
-        [row["DisNo."], row["Location"], loc]
-        for _, row in Emdata_loconly.iterrows()
-        for loc in functions.split_and_clean_locations(row["Location"])
-    ]
-
-    expanded_df = pd.DataFrame(
-        expanded_rows, columns=["DisNo.", "Full_Location_List", "Individual_Location"]
+    # 1 row per location of each event
+    expanded_df = functions.explode_parts(
+        Emdata_loconly[["DisNo.", "Location"]].rename(
+            columns={"Location": "Full_Location_List"}
+        ),
+        "Full_Location_List",
+        functions.split_and_clean_locations,
+        "Individual_Location",
     )
 
-    for term in constants.replace_terms:
-        expanded_df["Individual_Location"] = expanded_df[
-            "Individual_Location"
-        ].str.replace(term, " ", case=False, regex=False)
-
-    expanded_df["Individual_Location"] = expanded_df["Individual_Location"].apply(
-        functions.split_text
+    # remove the common terms (e.g. 'Province', 'District') in one pass, then the terms
+    # with a space again, as they can also start at the space left by another term
+    for terms in [
+        constants.replace_terms,
+        [term for term in constants.replace_terms if " " in term],
+    ]:
+        expanded_df["Individual_Location"] = functions.apply_replacements(
+            expanded_df["Individual_Location"],
+            functions.compile_replacements(
+                dict.fromkeys(terms, " "), regex=False, ignore_case=True
+            ),
+        )
+
+    expanded_df = functions.explode_parts(
+        expanded_df,
+        "Individual_Location",
+        functions.split_text,
+        "Individual_Location",
     )
-    expanded_df = expanded_df.explode("Individual_Location", ignore_index=True)
     expanded_df["Individual_Location"] = expanded_df["Individual_Location"].str.replace(
         r"\b(and| & |Between| \+ | \) and)\b", ",", regex=True
     )
 
-    new_data = [
-        [row["DisNo."], row["Individual_Location"], loc[0], loc[1]]
-        for _, row in expanded_df.iterrows()
-        for loc in functions.extract_locations(row["Individual_Location"])
-    ]
-
-    new_df = pd.DataFrame(
-        new_data,
-        columns=["DisNo.", "Individual_Location", "Location_Before", "Bracketed"],
+    # 1 row per location, with the region in brackets if any
+    new_df = functions.explode_parts(
+        expanded_df[["DisNo.", "Individual_Location"]],
+        "Individual_Location",
+        functions.extract_locations,
+        ["Location_Before", "Bracketed"],
     )
+    bracketed = new_df["Bracketed"].fillna("")
     new_df["Appended"] = (
-        new_df["Location_Before"]
-        + ","
-        + new_df["Bracketed"].apply(lambda x: f" {x}" if x else "")
+        new_df["Location_Before"] + "," + (" " + bracketed).where(bracketed != "", "")
     )
 
     print(new_df)
 
-    new_df["Appended"] = new_df["Appended"].apply(functions.remove_str_if_last)
+    # remove the trailing comma
+    new_df["Appended"] = new_df["Appended"].str.replace(r",\Z", "", regex=True)
 
     # remove locations that are only numbers or digits
 
-    numeric_rows = (
-        new_df[["Location_Before"]]
-        .applymap(lambda x: isinstance(x, str) and x.isdigit())
-        .any(axis=1)
-    )
+    numeric_rows = new_df["Location_Before"].str.isdigit()
     new_df = new_df[~numeric_rows]
 
     # Find locations where the number of characters is 2
-    one_char_rows = new_df[["Individual_Location"]].applymap(
-        lambda x: isinstance(x, str) and len(x) == 2
-    )
-    usa_rep_rows = new_df[one_char_rows.Individual_Location][
-        (new_df[one_char_rows.Individual_Location]["DisNo."].str.contains("USA"))
-    ]
+    two_char_rows = new_df["Individual_Location"].str.len() == 2
+    usa_rep_rows = two_char_rows & new_df["DisNo."].str.contains("USA")
 
-    # apply the correction to the locations in the USA
-    new_df.loc[usa_rep_rows.index] = new_df.loc[usa_rep_rows.index].replace(
-        constants.rep_us_states, regex=True
-    )
+    # apply the correction to the locations in the USA (state codes to state names)
+    for col in ["Individual_Location", "Location_Before", "Bracketed", "Appended"]:
+        new_df.loc[usa_rep_rows, col] = functions.map_exact(
+            new_df.loc[usa_rep_rows, col], constants.rep_us_states
+        )
 
     # extract the ISO column from the disaster number
-    new_df["ISO"] = new_df["DisNo."].str[-3:]
-
-    # search for and remove uncorrect ISO codes.
+    # search for and correct uncorrect ISO codes.
     # For some events, older ISO codes or iso codes other than iso 3 are used by EM-DAT
-    # ISO to correct: original iso and replacement
-    # AZO by PRT
-    # DFR by DEU
+    # (see constants.iso_legacy_codes)
     # 1346 by MNE
-    # SCG by SRB
-    new_df["ISO"].replace("AZO", "PRT", inplace=True)
-    new_df["ISO"].replace("DFR", "DEU", inplace=True)
-    new_df["ISO"].replace("SCG", "SRB", inplace=True)
+    new_df["ISO"] = functions.map_exact(
+        new_df["DisNo."].str[-3:], constants.iso_legacy_codes
+    )
 
     # event in montenegro that belonged to serbia in the past
     new_df.loc[(new_df.ISO == "SRB") & (new_df.Bracketed == "montenegro"), "ISO"] = (
@@ -177,12 +167,7 @@ def main():
     )
 
     # events to delete, as they happened in countries that no longer exist (e.g. Youguslavia), at the scale of entire countries today (e.g. Slovenia)
-    #'ANT'
-    #'SUN'
-    #'YUG'
-    new_df = new_df[~(new_df.ISO == "YUG")]
-    new_df = new_df[~(new_df.ISO == "SUN")]
-    new_df = new_df[~(new_df.ISO == "ANT")]
+    new_df = new_df[~new_df.ISO.isin(constants.iso_dropped_codes)]
 
     # 4 Apply Final Corrections and Export
     ######################################
@@ -4,20 +4,26 @@
 # This script is designed to geocode event locations using the GeoNames API.
 # It reads location data from a CSV file, converts ISO3 country codes to ISO2 format,
 # and makes API requests to GeoNames to retrieve geographic coordinates (latitude and longitude)
-# for each location. The results are saved in CSV files in chunks.
+# for each location. The results are appended to a journal file in chunks.
 
 # Key features:
-# - Implements rate limiting to comply with GeoNames' API limit of 900 requests per hour.
+# - Implements token-bucket rate limiting to comply with GeoNames' hourly and daily limits, spread over several usernames.
+# - Sends concurrent requests over a pool of keep-alive connections.
 # - Handles API retries with exponential backoff in case of request failures.
 # - Automatically retries failed geocoding requests for specific locations (e.g., South Sudan).
-# - Processes data in chunks to efficiently handle large datasets and allows saving results incrementally.
-# - Results are written to output files named according to their chunk number, allowing resumption from the last saved chunk.
+# - Geocodes each unique (location, ISO) pair once and fans the results out to all events.
+# - Caches results (including places not found) in a persistent cache.
+# - Results are appended to a journal after each chunk, allowing resumption after an interruption without losing completed locations.
 
 # The script uses several key functions:
 # 1. `get_country_alpha2_from_iso3`: Converts ISO3 country codes to ISO2 codes required by the GeoNames API.
-# 2. `make_request_with_rate_limiting`: Manages API requests with rate limiting to ensure compliance with GeoNames' limits.
+# 2. `GeoNamesClient`: Manages API requests with rate limiting to ensure compliance with GeoNames' limits.
 # 3. `get_place_coordinates_geonames`: Geocodes a location by querying the GeoNames API and handles errors and retries.
-# 4. Processes data in chunks from the input CSV, geocodes each location, and saves results to CSV files in the output directory.
+# 4. `geocode_unique_locations`: Geocodes each unique location through the cache, and fans the results out to all events.
+
+# Two geocoding backends are available:
+# - "api": queries the GeoNames API (rate limited, takes days for all locations)
+# - "offline": queries a local gazetteer built from the GeoNames dump (no quota, takes minutes)
 
 # Need to run the script twice:
 # First time with all locations that don't have the GAUL ID number
@@ -32,6 +38,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"
 from utils.paths import get_path  # Import the get_path function from paths.py
 import utils.constants as constants
 import utils.functions as functions
+import utils.geonames as geonames
 
 import numpy as np
 import pandas as pd
@@ -42,8 +49,39 @@ import datetime
 
 
 # geonames access
-# (replace with valid GeoNames username)
-username = "########"
+# (replace with valid GeoNames usernames, the requests are spread over all of them)
+usernames = ["########"]
+
+# number of locations geocoded concurrently
+max_workers = 4
+
+# geocoding backend: "api" or "offline"
+backend = "api"
+
+if backend == "offline":
+    gazetteer_path = get_path("geonames_gazetteer_path")
+    # build the gazetteer from the GeoNames dump the first time
+    if not os.path.exists(gazetteer_path):
+        geonames.build_geonames_gazetteer(
+            get_path("geonames_dump_path"),
+            get_path("geonames_admin1_path"),
+            gazetteer_path,
+        )
+    gazetteer = geonames.GeoNamesGazetteer(gazetteer_path)
+else:
+    # rate-limited client with pooled connections shared by all workers
+    client = geonames.GeoNamesClient(usernames, pool_size=max_workers)
+
+
+def geocode(place_name, iso3_code, event_id):
+    if backend == "offline":
+        return geonames.get_place_coordinates_gazetteer(
+            place_name, iso3_code, event_id, gazetteer
+        )
+    return functions.get_place_coordinates_geonames(
+        place_name, iso3_code, event_id, usernames[0], client=client
+    )
+
 
 # Read the CSV files with location names
 # Retrieve path to locations to geolocate
@@ -55,9 +93,6 @@ if os.path.exists(df_locations_path):
 else:
     print(f"File not found at {df_locations_path}")
 
-# Initialize an empty DataFrame to store the results
-results_locations = pd.DataFrame()
-
 # Set the chunk size
 chunk_size = 150
 
@@ -69,66 +104,34 @@ output_dir = intermediate_data_path + "identified_locations/"
 if not os.path.exists(output_dir):
     os.makedirs(output_dir)
 
-existing_files = [
-    f for f in os.listdir(output_dir) if f.startswith("EMDAT_golocations_coordinates_q")
+# Persistent cache of geocoding results, keyed by (normalized location name, ISO).
+# Each unique pair is geocoded only once, and the pairs already in the cache are
+# not geocoded again when the script is restarted.
+geocoding_cache = geonames.GeocodingCache(
+    get_path("geocoding_cache_path"), version=backend
+)
+
+# Append-only journal of the geocoded locations: the events already written are
+# skipped when the script is restarted after an interruption
+journal = geonames.GeocodingJournal(output_dir + "EMDAT_golocations_coordinates.jsonl")
+remaining_locations = df_locations[
+    ~journal.contains(
+        df_locations["DisNo."], df_locations["Location"].astype(str).str.strip()
+    )
 ]
-existing_files.sort(key=lambda x: int(x.split("q")[-1].split(".")[0]))
-
-# Determine the starting chunk number
-if existing_files:
-    last_file = existing_files[-1]
-    last_chunk_number = int(last_file.split("q")[-1].split(".")[0])
-    start_index = last_chunk_number * chunk_size
-else:
-    last_chunk_number = 0
-    start_index = 0
-
-# Loop through the DataFrame starting from the last chunk
-for j in range(start_index, len(df_locations)):
-    print(j, "/", len(df_locations))
-
-    result = {}
-    event = df_locations.iloc[j][["ISO", "Location", "DisNo."]]
-    result.update(
-        {
-            event[1]: functions.get_place_coordinates_geonames(
-                event[1].strip(), event[0], event[2], username
-            )
-        }
+print(f"{len(df_locations) - len(remaining_locations)} locations already geocoded")
+
+# Geocode the locations in chunks: each unique (Location, ISO) pair is geocoded,
+# the results are fanned out to all events and appended to the journal
+for start_index in range(0, len(remaining_locations), chunk_size):
+    print(start_index, "/", len(remaining_locations))
+    results_locations = geonames.geocode_unique_locations(
+        remaining_locations.iloc[start_index : start_index + chunk_size],
+        geocode,
+        geocoding_cache,
+        max_workers=max_workers,
     )
-    event_df = pd.DataFrame.from_dict(result, orient="index")
-    event_df.columns = [
-        "DisNo.",
-        "EM-DAT-Location",
-        "Longitude",
-        "Latitude",
-        "geoNames",
-        "Province",
-    ]
-
-    # Append the result to the results DataFrame
-    results_locations = pd.concat([results_locations, event_df])
-
-    # Check if we've reached the chunk size or the end of the DataFrame
-    if (j + 1) % chunk_size == 0 or (j + 1) == len(df_locations):
-        # Reset the index of the results DataFrame
-        results_locations = results_locations.reset_index(drop=True)
-
-        # Determine the file number based on the current index
-        file_number = (j + 1) // chunk_size
-
-        # Write the results to a CSV file
-        results_locations.to_csv(
-            f"{output_dir}/EMDAT_golocations_coordinates_q{file_number}.csv",
-            index=False,
-        )
-
-        # Clear the results DataFrame for the next chunk
-        results_locations = pd.DataFrame()
+    journal.append(results_locations)
 
-# Handle any remaining results that didn't fill a full chunk
-if not results_locations.empty:
-    file_number += 1
-    results_locations.to_csv(
-        f"{output_dir}/EMDAT_golocations_coordinates_q{file_number}.csv", index=False
-    )
+journal.close()
+geocoding_cache.close()
@@ -24,7 +24,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"
 
 from utils.paths import get_path  # Import the get_path function from paths.py
 import utils.constants as constants
+import utils.corrections as corrections
 import utils.functions as functions
+import utils.geonames as geonames
+import utils.loaders as loaders
 
 # 1 Load and Merge Location Data
 ######################################
@@ -32,18 +35,11 @@ import utils.functions as functions
 identified_locations_path = get_path("identified_locations_path")
 corrected_locations_path = get_path("corrected_locations_path")
 
-all_files = glob.glob(os.path.join(identified_locations_path + "*.csv"))
-all_files.sort(key=lambda x: int(x.split("q")[-1].split(".")[0]))
-df_locations = pd.concat((pd.read_csv(f) for f in all_files), ignore_index=False)
+df_locations = geonames.read_geocoded_locations(identified_locations_path)
 df_locations_complete = df_locations[~np.isnan(df_locations.Longitude)]
 df_locations_complete = df_locations_complete.drop_duplicates(keep="first")
 
-all_files_corrected = glob.glob(os.path.join(corrected_locations_path + "*.csv"))
-df_locations_corrected = (
-    pd.concat((pd.read_csv(f) for f in all_files_corrected), ignore_index=False)
-    .reset_index()
-    .drop(columns={"Unnamed: 0", "index"})
-)
+df_locations_corrected = geonames.read_geocoded_locations(corrected_locations_path)
 df_locations_corrected_complete = df_locations_corrected[
     ~np.isnan(df_locations_corrected.Longitude)
 ]
@@ -83,261 +79,26 @@ df_locations_geonames_iso = df_locations_geonames_iso.drop_duplicates(keep="firs
 
 # 2 Manual Corrections for Specific Events
 ########################
-# manual corrections
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0218-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0218-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0218-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0543-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0543-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0543-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1992-0268-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1992-0268-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1992-0268-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1993-0424-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1993-0424-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1993-0424-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1996-0247-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1996-0247-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1996-0247-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1997-0040-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1997-0040-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1997-0040-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0005-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0005-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0005-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0327-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0327-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0327-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "2002-0858-USA")
-    & (df_locations_geonames_iso["Location"] == "rhode"),
-    "Location",
-] = "Rhode Island"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "2002-0858-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Longitude",
-] = -71.49978
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "2002-0858-USA")
-    & (df_locations_geonames_iso["Location"] == "Rhode Island"),
-    "Latitude",
-] = 41.75038
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0492-USA")
-    & (df_locations_geonames_iso["Location"] == "north"),
-    "Location",
-] = "North Carolina"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0492-USA")
-    & (df_locations_geonames_iso["Location"] == "North Carolina"),
-    "Longitude",
-] = -80.00032
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0492-USA")
-    & (df_locations_geonames_iso["Location"] == "North Carolina"),
-    "Latitude",
-] = 35.50069
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0502-USA")
-    & (df_locations_geonames_iso["Location"] == "north"),
-    "Location",
-] = "North Carolina"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0502-USA")
-    & (df_locations_geonames_iso["Location"] == "North Carolina"),
-    "Longitude",
-] = -80.00032
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1991-0502-USA")
-    & (df_locations_geonames_iso["Location"] == "North Carolina"),
-    "Latitude",
-] = 35.50069
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1994-0023-USA")
-    & (df_locations_geonames_iso["Location"] == "north"),
-    "Location",
-] = "North Carolina"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1994-0023-USA")
-    & (df_locations_geonames_iso["Location"] == "North Carolina"),
-    "Longitude",
-] = -80.00032
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1994-0023-USA")
-    & (df_locations_geonames_iso["Location"] == "North Carolina"),
-    "Latitude",
-] = 35.50069
-
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0005-USA")
-    & (df_locations_geonames_iso["Location"] == "south"),
-    "Location",
-] = "South Carolina"
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0005-USA")
-    & (df_locations_geonames_iso["Location"] == "South Carolina"),
-    "Longitude",
-] = -81.00009
-df_locations_geonames_iso.loc[
-    (df_locations_geonames_iso["DisNo."] == "1999-0005-USA")
-    & (df_locations_geonames_iso["Location"] == "South Carolina"),
-    "Latitude",
-] = 34.00043
+# manual corrections (renamed locations and their coordinates), listed in the corrections table
+manual_corrections = corrections.read_corrections()
+df_locations_geonames_iso = corrections.apply_corrections(
+    df_locations_geonames_iso, manual_corrections, "geonames"
+)
 
 #### 3 Matching with gaul locations
 ########################
 
-# load gaul data
-gaul1 = gpd.read_file(get_path("gaul1_path"))
-gaul2 = gpd.read_file(get_path("gaul2_path"))
+# load gaul data (from the GeoParquet cache, only the needed columns)
+gaul1 = loaders.read_gaul(1, columns=["iso3", "ADM1_CODE", "ADM1_NAME"])
+gaul2 = loaders.read_gaul(2, columns=["iso3", "ADM1_CODE", "ADM2_CODE", "ADM2_NAME"])
 
 # find intersections of geonames identified locations with
-# gaul 1 and gaul2 geometries
-
-result_gaul1 = []
-
-for i in np.arange(len(df_locations_geonames_iso)):
-    try:
-        print(i)
-        result_gaul1.append(
-            functions.find_containing_geometry(
-                gaul1,
-                df_locations_geonames_iso.iloc[i].Longitude,
-                df_locations_geonames_iso.iloc[i].Latitude,
-            ).ADM1_CODE.values[0]
-        )
-    except Exception as e:
-        print(f"Error at index {i}: {e}")
-        result_gaul1.append("No match")
-
-
-result_gaul2 = []
-
-for i in np.arange(len(df_locations_geonames_iso)):
-    try:
-        print(i)
-        result_gaul2.append(
-            functions.find_containing_geometry(
-                gaul2,
-                df_locations_geonames_iso.iloc[i].Longitude,
-                df_locations_geonames_iso.iloc[i].Latitude,
-            ).ADM2_CODE.values[0]
-        )
-    except Exception as e:
-        print(f"Error at index {i}: {e}")
-        result_gaul2.append("No match")
-
-df_locations_geonames_iso["ADM1_CODE"] = result_gaul1
-df_locations_geonames_iso["ADM2_CODE"] = result_gaul2
+# gaul 1 and gaul2 geometries (one spatial join per admin level for all locations)
+
+admin_codes = functions.assign_admin_codes(df_locations_geonames_iso, gaul1, gaul2)
+
+df_locations_geonames_iso["ADM1_CODE"] = admin_codes["ADM1_CODE"].values
+df_locations_geonames_iso["ADM2_CODE"] = admin_codes["ADM2_CODE"].values
 
 # extract corresponding region names and codes from GAUL
 df_locations_geonames_iso = df_locations_geonames_iso[
@@ -380,13 +141,12 @@ df_locations_geonames_iso = df_locations_geonames_iso[
 
 #### find names proximity to identify if locations are admin 1 or admin 2 level
 
-# Apply the function to each row
-df_locations_geonames_iso["similarity_ADM1"] = df_locations_geonames_iso.apply(
-    functions.calculate_similarity_ADM1, axis=1
+# Score all rows at once
+df_locations_geonames_iso["similarity_ADM1"] = functions.calculate_similarity(
+    df_locations_geonames_iso, "Location", "ADM1_NAME"
 )
-# Apply the function to each row
-df_locations_geonames_iso["similarity_ADM2"] = df_locations_geonames_iso.apply(
-    functions.calculate_similarity_ADM2, axis=1
+df_locations_geonames_iso["similarity_ADM2"] = functions.calculate_similarity(
+    df_locations_geonames_iso, "Location", "ADM2_NAME"
 )
 
 # admin 1 regions
@@ -418,9 +178,9 @@ no_match_names_no_adm1 = no_match_names[
 ]
 no_match_names = no_match_names.drop(no_match_names_no_adm1.index)
 
-# Apply the function to each row
-no_match_names["similarity_geonames"] = no_match_names.apply(
-    functions.calculate_similarity_geonames, axis=1
+# Score all rows at once
+no_match_names["similarity_geonames"] = functions.calculate_similarity(
+    no_match_names, "Location", "geoNames"
 )
 admin2_geonames = no_match_names[
     (no_match_names["similarity_geonames"] >= 60)
@@ -434,50 +194,25 @@ no_match_names = no_match_names.reset_index()
 
 # find locations matching by provinces (ADM1)
 
-no_match_province_df = no_match_names.apply(
-    lambda row: functions.find_match_province_adm1(row, gaul1), axis=1
-)
-dfprovince_list = []
-
-for dfi in no_match_province_df:
-    if not dfi.empty:
-        dfprovince_list.append(dfi)
+# index of GAUL region names per country, built once for all name matches
+gaul1_name_index = functions.build_gaul_name_index(gaul1, 1)
+gaul2_name_index = functions.build_gaul_name_index(gaul2, 2)
 
-name_located_province = pd.concat(dfprovince_list)
+name_located_province = functions.find_retun_province_matches(
+    no_match_names, gaul1, gaul1_name_index
+)
 no_match_names_matching_adm1 = no_match_names.set_index("index").loc[
     name_located_province["index"]
 ]
 
-# determine indices of locations that are wrong and should be dropped
-indices_to_drop = no_match_names_matching_adm1[
-    (no_match_names_matching_adm1["DisNo."] == "2023-0828-AUS")
-    & ((no_match_names_matching_adm1["Location"] == "daintree"))
-    | (no_match_names_matching_adm1["DisNo."] == "1995-0445-AUS")
-    & ((no_match_names_matching_adm1["Location"] == "tarree"))
-    | (no_match_names_matching_adm1["DisNo."] == "1991-0218-USA")
-    & ((no_match_names_matching_adm1["Location"] == "richmond"))
-    | (no_match_names_matching_adm1["DisNo."] == "1994-0599-USA")
-    & ((no_match_names_matching_adm1["Location"] == "eureka"))
-    | (no_match_names_matching_adm1["DisNo."] == "1995-0026-USA")
-    & ((no_match_names_matching_adm1["Location"] == "middle west"))
-    | (no_match_names_matching_adm1["DisNo."] == "1993-0430-USA")
-    & ((no_match_names_matching_adm1["Location"] == "harris"))
-    | (no_match_names_matching_adm1["DisNo."] == "1999-0435-USA")
-    & ((no_match_names_matching_adm1["Location"] == "bahamas"))
-    | (no_match_names_matching_adm1["DisNo."] == "1999-0619-USA")
-    & ((no_match_names_matching_adm1["Location"] == "bahamas"))
-    | (no_match_names_matching_adm1["DisNo."] == "2022-0734-USA")
-    & ((no_match_names_matching_adm1["Location"] == "bahamas"))
-    | (no_match_names_matching_adm1["DisNo."] == "1990-0357-USA")
-    & ((no_match_names_matching_adm1["Location"] == "caroline du nord"))
-    | (no_match_names_matching_adm1["DisNo."] == "1995-0150-USA")
-    & ((no_match_names_matching_adm1["Location"] == "missouri, dc"))
-    | (no_match_names_matching_adm1["DisNo."] == "1995-0150-USA")
-    & ((no_match_names_matching_adm1["Location"] == "missouri, dc"))
-].index
-
-# drop these locations
-no_match_names_matching_adm1 = no_match_names_matching_adm1.drop(indices_to_drop)
+# drop the locations that are wrong (see the corrections table)
+# The corrections drop rows by (DisNo., Location), where the previous code dropped index
+# labels. Both are the same here: the "index" labels come from the RangeIndex of
+# df_locations_geonames_iso, so they are unique in no_match_names, and a label repeated
+# in no_match_names_matching_adm1 is the same row, matched to several provinces.
+no_match_names_matching_adm1 = corrections.apply_corrections(
+    no_match_names_matching_adm1, manual_corrections, "province_matches"
+)
 
 # remove so far identified adm1 locations (keep only adm2 locations)
 no_match_names_NOTmatching_adm1 = (
@@ -513,10 +248,10 @@ no_match_names_NOTmatching_adm1 = (
 
 # find name matches for regions level 1
 admin1_name_matched_gaul = functions.find_retun_adm1_matches(
-    no_match_names_NOTmatching_adm1, gaul1
+    no_match_names_NOTmatching_adm1, gaul1, gaul1_name_index
 )
 admin2_name_matched_gaul = functions.find_retun_adm2_matches(
-    no_match_names_NOTmatching_adm1, gaul2
+    no_match_names_NOTmatching_adm1, gaul2, gaul2_name_index
 )
 admin1_name_matched_gaul = admin1_name_matched_gaul[
     admin1_name_matched_gaul["index"]
@@ -531,20 +266,13 @@ no_match_names_NOTmatching_adm1 = (
     .reset_index()
 )
 
-no_match_names_NOTmatching_adm1["similarity_loc_pro"] = (
-    no_match_names_NOTmatching_adm1.apply(
-        functions.calculate_similarity_location_province, axis=1
-    )
+no_match_names_NOTmatching_adm1["similarity_loc_pro"] = functions.calculate_similarity(
+    no_match_names_NOTmatching_adm1, "Location", "Province"
 )
 
-indices_to_drop2 = no_match_names_NOTmatching_adm1[
-    (no_match_names_NOTmatching_adm1["DisNo."] == "2023-0760-BOL")
-    & ((no_match_names_NOTmatching_adm1["Location"] == "suárez"))
-    | (no_match_names_NOTmatching_adm1["DisNo."] == "2023-0760-BOL")
-    & ((no_match_names_NOTmatching_adm1["Location"] == "carmen rivero torrez"))
-].index
-
-no_match_names_NOTmatching_adm1 = no_match_names_NOTmatching_adm1.drop(indices_to_drop2)
+no_match_names_NOTmatching_adm1 = corrections.apply_corrections(
+    no_match_names_NOTmatching_adm1, manual_corrections, "unmatched_locations"
+)
 
 admin_1_last_subset = no_match_names_NOTmatching_adm1[
     no_match_names_NOTmatching_adm1["similarity_loc_pro"] >= 60
@@ -17,51 +17,105 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"
 from utils.paths import get_path  # Import the get_path function from paths.py
 import utils.constants as constants
 import utils.functions as functions
+import utils.loaders as loaders
 
-print("1 Load geolocated climate events data")
-# 1 Load Geolocated Climate Events Data
-###############################
-
-climate_event_locations_90_23 = gpd.read_file(
-    get_path("geocoded_locations_path"), driver="GPKG"
-)
-
-climate_event_locations_90_23 = climate_event_locations_90_23.set_index("DisNo.")
-# Duplicate quality flags for each location
-# This is done to ensure that the quality flags are preserved for each location
-# and for the national overlay process
-climate_event_locations_90_23["regional_flags"] = climate_event_locations_90_23[
-    "geocoding_q"
-]
-
-print("2 Aggregate locations by event")
-# 2 Aggregate Locations by event and save data
-###############################
-
-climate_event_locations_90_23_national_overlay = climate_event_locations_90_23.dissolve(
-    by=["DisNo."],
-    aggfunc={
-        "ADM1_NAME": lambda x: " - ".join(np.unique((x).astype(str))),
-        "ADM1_CODE": lambda x: " - ".join(np.unique((x).astype(str))),
-        "ADM2_NAME": lambda x: " - ".join(np.unique((x).astype(str))),
-        "ADM2_CODE": lambda x: " - ".join(np.unique((x).astype(str))),
-        "Location": lambda x: " - ".join(np.unique((x).astype(str))),
-        "geoNames": lambda x: " - ".join(np.unique((x).astype(str))),
-        "ISO": lambda x: np.unique(x)[0],
-        "admin_level": lambda x: " - ".join(np.unique((x).astype(str))),
-        "geocoding_q": lambda x: np.max((x).astype(str)),
-        "regional_flags": lambda x: " - ".join(np.unique(x.astype(str))),
-    },
-)
-
-print("3 write data")
-# 3 Write data
-###############################
-# write identified locations
-climate_event_locations_90_23_national_overlay.to_file(
-    get_path("intermediate_data_path")
-    + "geolocated_climate_events_1990-2023_national_clean.gpkg",
-    driver="GPKG",
-)
-
-print("National overlay of geolocated climate events saved to file")
+# number of processes used for the unions of the event geometries
+max_workers = 4
+# "full": overlay all the events, or "delta": overlay only the events whose locations
+# changed since the last run, and merge them into the existing output
+update_mode = "full"
+
+
+def main():
+    print("1 Load geolocated climate events data")
+    # 1 Load Geolocated Climate Events Data
+    ###############################
+
+    # geolocated events of script 4, in the layout they were written in
+    climate_event_locations_90_23 = loaders.read_geolocated_events()
+
+    # hash of the locations of each event, to find the events changed since the last run
+    input_hashes = loaders.event_hashes(
+        climate_event_locations_90_23,
+        list(climate_event_locations_90_23.columns.drop(["DisNo.", "geometry"])),
+    )
+    delta = update_mode == "delta"
+    if delta and not os.path.exists(get_path("national_overlay_path")):
+        # without the output of the last run, there is nothing to merge the changes into
+        print("No previous national overlay found, overlaying all the events")
+        delta = False
+    if delta:
+        updated_events, removed_events = loaders.changed_events(
+            input_hashes, loaders.read_event_snapshot("national_overlay")
+        )
+        print(
+            f"{len(updated_events)} new or changed events, {len(removed_events)} removed"
+        )
+        climate_event_locations_90_23 = climate_event_locations_90_23[
+            climate_event_locations_90_23["DisNo."].isin(updated_events)
+        ]
+
+    climate_event_locations_90_23 = climate_event_locations_90_23.set_index("DisNo.")
+    # Duplicate quality flags for each location
+    # This is done to ensure that the quality flags are preserved for each location
+    # and for the national overlay process
+    climate_event_locations_90_23["regional_flags"] = climate_event_locations_90_23[
+        "geocoding_q"
+    ]
+
+    print("2 Aggregate locations by event")
+    # 2 Aggregate Locations by event and save data
+    ###############################
+
+    # unions of the same set of regions are computed once, and kept for the next runs
+    # as long as the GAUL geometries (prepared in script 4) are unchanged
+    union_cache = functions.UnionCache(
+        get_path("union_cache_path"),
+        version=loaders.prepared_gaul_version(tolerance=0.005),
+    )
+
+    # join the unique values of the locations of each event, and union their geometries
+    climate_event_locations_90_23_national_overlay = functions.dissolve_events(
+        climate_event_locations_90_23,
+        by="DisNo.",
+        aggfunc={
+            "ADM1_NAME": "join",
+            "ADM1_CODE": "join",
+            "ADM2_NAME": "join",
+            "ADM2_CODE": "join",
+            "Location": "join",
+            "geoNames": "join",
+            "ISO": "first",
+            "admin_level": "join",
+            "geocoding_q": "max",
+            "regional_flags": "join",
+        },
+        max_workers=max_workers,
+        union_cache=union_cache,
+    )
+    union_cache.close()
+
+    if delta:
+        # merge the new and changed events into the output of the last run
+        climate_event_locations_90_23_national_overlay = functions.merge_event_rows(
+            gpd.read_file(get_path("national_overlay_path")),
+            climate_event_locations_90_23_national_overlay.reset_index(),
+            updated_events.union(removed_events),
+        ).set_index("DisNo.")
+
+    print("3 write data")
+    # 3 Write data
+    ###############################
+    # write identified locations
+    climate_event_locations_90_23_national_overlay.to_file(
+        get_path("national_overlay_path"), driver="GPKG"
+    )
+
+    # record the inputs of this run, for the next incremental update
+    loaders.write_event_snapshot("national_overlay", input_hashes)
+
+    print("National overlay of geolocated climate events saved to file")
+
+
+if __name__ == "__main__":
+    main()
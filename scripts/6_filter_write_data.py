@@ -15,20 +15,20 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"
 
 from utils.paths import get_path  # Import the get_path function from paths.py
 import utils.constants as constants
+import utils.corrections as corrections
 import utils.functions as functions
+import utils.loaders as loaders
 
 print("1 Load geolocated climate events data")
 # 1 Load Geolocated Climate Events Data
 ###############################
-disasters_90_23 = gpd.read_file(get_path("geocoded_national_path"), driver="GPKG")
-disaster_locations_90_23 = gpd.read_file(
-    get_path("geocoded_locations_path"), driver="GPKG"
-)
-emdat = pd.read_excel(get_path("emdat_path"))
+disasters_90_23 = gpd.read_file(get_path("national_overlay_path"), driver="GPKG")
+disaster_locations_90_23 = loaders.read_geolocated_events()
+emdat = loaders.read_emdat()
 
 # select only geocoded event information
 event_indices = disasters_90_23["DisNo."]
-geocoded_emdat = emdat.set_index("DisNo.").loc[event_indices]
+geocoded_emdat = emdat.loc[event_indices]
 
 print("2 Select only events with impact information")
 # 2 Select only events with impact information
@@ -39,9 +39,6 @@ columns_to_check = ["Total Deaths", "Total Affected", "Total Damage ('000 US$)"]
 geocoded_emdat = geocoded_emdat.dropna(how="all", subset=columns_to_check)
 selected_events = list(geocoded_emdat.index)
 
-### reorder columns, calculate area in Km2
-disasters_90_23["area_km2"] = np.round(disasters_90_23.to_crs(6933).area / 1e6, 2)
-
 print("3 Manual corrections")
 # 3 Manual corrections
 ################################
@@ -49,9 +46,9 @@ print("3 Manual corrections")
 disasters_90_23 = disasters_90_23.set_index("DisNo.")
 # keep only events with available impact information
 disasters_90_23 = disasters_90_23.loc[selected_events]
-# drop inaccurately geocoded events
+# drop inaccurately geocoded events (see the corrections table)
 disasters_90_23 = disasters_90_23.drop(
-    ["1993-0585-IRN", "1999-0298-USA", "2022-0863-USA"]
+    corrections.dropped_events(corrections.read_corrections(), "geocoded_events")
 ).sort_values("DisNo.")
 # Filter locations only for events we keep
 events_to_keep = list(disasters_90_23.index)
@@ -59,6 +56,14 @@ disaster_locations_90_23 = disaster_locations_90_23.set_index("DisNo.").loc[
     events_to_keep
 ]
 
+### calculate area in Km2 (equal-area projection EPSG:6933), once per region for the locations
+disasters_90_23["area_km2"] = np.round(
+    functions.equal_area_km2(disasters_90_23.geometry), 2
+)
+disaster_locations_90_23["area_km2"] = np.round(
+    functions.region_area_km2(disaster_locations_90_23).values, 2
+)
+
 print("4 write cleaned data")
 # 4 Write cleaned data
 ################################
@@ -67,11 +72,7 @@ disasters_90_23 = disasters_90_23.reset_index()
 disaster_locations_90_23 = disaster_locations_90_23.reset_index()
 
 # write identified locations
-disasters_90_23.to_file(
-    get_path("clean_data_path") + "disaster_national_90_23.gpkg", driver="GPKG"
-)
-disaster_locations_90_23.to_file(
-    get_path("clean_data_path") + "disaster_subnational_90_23.gpkg", driver="GPKG"
-)
+disasters_90_23.to_file(get_path("geocoded_national_path"), driver="GPKG")
+disaster_locations_90_23.to_file(get_path("geocoded_locations_path"), driver="GPKG")
 
 print("Clean data saved to file")
@@ -0,0 +1,337 @@
+# Pipeline runner for the scripts of the repository
+#
+# Each script is a stage with declared inputs and outputs (names of paths in utils/paths.py).
+# The runner fingerprints them by content, and runs a stage only if its script, the modules
+# of src/utils it imports, its inputs or its outputs changed since its last successful run
+# (or if an output is missing).
+# Stages whose dependencies are satisfied run concurrently, as separate processes.
+#
+# Usage, from the root of the repository:
+#   python -m src.pipeline                # run the stages that are out of date
+#   python -m src.pipeline 5 6            # consider only scripts 5 and 6
+#   python -m src.pipeline --force 4      # run script 4 even if it is up to date
+#   python -m src.pipeline --dry-run      # list the stages that would run
+#   python -m src.pipeline --record 1 2   # mark scripts 1 and 2 as up to date, without running them
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .utils.paths import BASE_DIR, get_path
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "scripts"))
+UTILS_DIR = os.path.join(BASE_DIR, "utils")
+
+# stages in the order of the scripts: (script, inputs, outputs)
+# an output given as a tuple is written in one of several layouts (any one of them is enough)
+STAGES = [
+    ("1_clean_emdat.py", ["emdat_path"], ["df_locations_path"]),
+    (
+        "2_geolocation_geonames.py",
+        ["df_locations_path"],
+        ["identified_locations_path"],
+    ),
+    (
+        "3_clean_geonames.py",
+        [
+            "identified_locations_path",
+            "corrected_locations_path",
+            "df_locations_path",
+            "df_locations_corrected_path",
+            "gaul1_path",
+            "gaul2_path",
+            "manual_corrections_path",
+        ],
+        ["geonames_locations_clean_path"],
+    ),
+    (
+        "4_geolocation_identified_GAUL_Id.py",
+        ["emdat_path", "gaul1_path", "gaul2_path", "geonames_locations_clean_path"],
+        [("geolocated_events_path", "geolocated_events_normalized_path")],
+    ),
+    (
+        "5_national_overlay.py",
+        ["geolocated_events_path", "geolocated_events_normalized_path"],
+        ["national_overlay_path"],
+    ),
+    (
+        "6_filter_write_data.py",
+        [
+            "emdat_path",
+            "geolocated_events_path",
+            "geolocated_events_normalized_path",
+            "national_overlay_path",
+            "manual_corrections_path",
+        ],
+        ["geocoded_national_path", "geocoded_locations_path"],
+    ),
+    (
+        "7_compare_gdis.py",
+        ["geocoded_locations_path", "gdis_data_path"],
+        ["gdis_comparison_path"],
+    ),
+]
+
+
+def output_names(outputs):
+    """
+    Names of the outputs of a stage, the layouts of an output given as a tuple included.
+    """
+    return [
+        name
+        for output in outputs
+        for name in (output if isinstance(output, tuple) else [output])
+    ]
+
+
+def stage_dependencies(stages):
+    """
+    Stages producing the inputs of each stage.
+
+    Parameters:
+    - stages (list): The (script, inputs, outputs) of the stages.
+
+    Returns:
+    - dict: {script: set of scripts it depends on}.
+    """
+    producers = {
+        output: script
+        for script, _, outputs in stages
+        for output in output_names(outputs)
+    }
+    return {
+        script: {producers[i] for i in inputs if i in producers} - {script}
+        for script, inputs, _ in stages
+    }
+
+
+class FingerprintStore:
+    """
+    Content hashes of files and folders, kept in a JSON state file together with the
+    fingerprints of the last successful run of each stage. Files are hashed again only
+    when their size or modification time changed.
+
+    Parameters:
+    - state_path (str): Path of the JSON state file (created if missing).
+    """
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.state = {"files": {}, "stages": {}}
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                self.state = json.load(f)
+
+    def save(self):
+        # write to a temporary file first, so that an interrupted write is never read
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def _file_hash(self, path):
+        stat = os.stat(path)
+        known = self.state["files"].get(path)
+        if (
+            known
+            and known["size"] == stat.st_size
+            and known["mtime"] == stat.st_mtime_ns
+        ):
+            return known["hash"]
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.state["files"][path] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": h.hexdigest(),
+        }
+        return h.hexdigest()
+
+    def fingerprint(self, path):
+        """
+        Content hash of a file, or of the names and contents of the files of a folder
+        (None if the path does not exist).
+        """
+        if os.path.isfile(path):
+            return self._file_hash(path)
+        if not os.path.isdir(path):
+            return None
+        h = hashlib.sha1()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                h.update(os.path.relpath(file_path, path).encode())
+                h.update(self._file_hash(file_path).encode())
+        return h.hexdigest()
+
+    def code_fingerprint(self):
+        """
+        Content hash of the Python modules of src/utils, shared by all the scripts.
+        """
+        h = hashlib.sha1()
+        for name in sorted(os.listdir(UTILS_DIR)):
+            if name.endswith(".py"):
+                h.update(name.encode())
+                h.update(self._file_hash(os.path.join(UTILS_DIR, name)).encode())
+        return h.hexdigest()
+
+    def stage_fingerprints(self, script, inputs, outputs):
+        return {
+            "script": self.fingerprint(os.path.join(SCRIPTS_DIR, script)),
+            "code": self.code_fingerprint(),
+            "inputs": {name: self.fingerprint(get_path(name)) for name in inputs},
+            "outputs": {
+                name: self.fingerprint(get_path(name)) for name in output_names(outputs)
+            },
+        }
+
+    def is_up_to_date(self, script, inputs, outputs):
+        current = self.stage_fingerprints(script, inputs, outputs)
+        # every output must exist, in at least one of its layouts
+        for output in outputs:
+            layouts = output if isinstance(output, tuple) else (output,)
+            if all(current["outputs"][name] is None for name in layouts):
+                return False
+        return self.state["stages"].get(script) == current
+
+    def record(self, script, inputs, outputs):
+        self.state["stages"][script] = self.stage_fingerprints(script, inputs, outputs)
+        self.save()
+
+
+def run_script(script):
+    """
+    Run a script in its own Python process, from the scripts folder.
+
+    Returns:
+    - int: The return code of the script.
+    """
+    print(f"Running {script}")
+    return subprocess.run([sys.executable, script], cwd=SCRIPTS_DIR).returncode
+
+
+def run_pipeline(
+    selected=None, force=False, dry_run=False, record=False, max_workers=1
+):
+    """
+    Run the stages that are out of date, each one after the stages it depends on.
+
+    Parameters:
+    - selected (list, optional): The scripts to consider (default: all). The other
+      stages are assumed to be up to date.
+    - force (bool): Run the selected stages even if they are up to date.
+    - dry_run (bool): Only print the stages that would run (assuming upstream stages
+      do not change their outputs).
+    - record (bool): Record the current fingerprints of the stages as up to date,
+      without running them (e.g. for outputs produced before using the runner).
+    - max_workers (int): The number of stages run at the same time.
+
+    Returns:
+    - bool: True if all the stages that ran succeeded.
+    """
+    stages = [stage for stage in STAGES if selected is None or stage[0] in selected]
+    declared = {script: (inputs, outputs) for script, inputs, outputs in stages}
+    dependencies = stage_dependencies(stages)
+    store = FingerprintStore(get_path("pipeline_state_path"))
+
+    if record:
+        for script, inputs, outputs in stages:
+            store.record(script, inputs, outputs)
+            print(f"{script} recorded as up to date")
+        return True
+
+    pending = [script for script, _, _ in stages]
+    done, failed = set(), set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # stages whose dependencies are done are checked, then run if out of date
+            for script in list(pending):
+                if dependencies[script] & failed:
+                    print(f"Skipping {script}: a stage it depends on failed")
+                    pending.remove(script)
+                    failed.add(script)
+                elif dependencies[script] <= done:
+                    pending.remove(script)
+                    if not force and store.is_up_to_date(script, *declared[script]):
+                        print(f"{script} is up to date")
+                        done.add(script)
+                    elif dry_run:
+                        print(f"{script} would run")
+                        done.add(script)
+                    else:
+                        running[executor.submit(run_script, script)] = script
+
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Stages with unmet dependencies: {pending}")
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                script = running.pop(future)
+                if future.result() == 0:
+                    store.record(script, *declared[script])
+                    done.add(script)
+                else:
+                    print(f"{script} failed with return code {future.result()}")
+                    failed.add(script)
+
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the scripts whose inputs changed since their last run."
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        help="numbers or file names of the scripts to consider (default: all)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="run the stages even if up to date"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only print the stages that would run"
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="record the stages as up to date without running them",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="number of stages run at the same time"
+    )
+    args = parser.parse_args()
+
+    selected = None
+    if args.stages:
+        scripts = [script for script, _, _ in STAGES]
+        selected = [
+            script
+            for script in scripts
+            if any(script == s or script.split("_", 1)[0] == s for s in args.stages)
+        ]
+        unknown = [
+            s
+            for s in args.stages
+            if not any(
+                script == s or script.split("_", 1)[0] == s for script in scripts
+            )
+        ]
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    ok = run_pipeline(selected, args.force, args.dry_run, args.record, args.jobs)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
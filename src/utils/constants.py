@@ -89,6 +89,14 @@ rep_philippines = {
     "1": "Ilocos region",
 }
 
+# region name replacements of each country (ISO code), applied to the lowercased locations
+rep_countries = {
+    "PHL": rep_philippines,
+    "BFA": rep_burkina,
+    "HTI": rep_haiti,
+    "TCD": rep_chad,
+}
+
 rep_us_states = {
     "al": "alabama",
     "ak": "alaska",
@@ -142,6 +150,17 @@ rep_us_states = {
     "wy": "wyoming",
 }
 
+# ISO codes used by EM-DAT for some events that are older codes or not ISO 3 codes:
+# original iso and replacement
+iso_legacy_codes = {
+    "AZO": "PRT",
+    "DFR": "DEU",
+    "SCG": "SRB",
+}
+
+# ISO codes of countries that no longer exist (e.g. Yugoslavia), whose events are deleted
+iso_dropped_codes = ["YUG", "SUN", "ANT"]
+
 replace_terms = [
     "Near",
     "Between",
@@ -0,0 +1,100 @@
+# module applying the manual corrections of the geocoded locations
+
+# The corrections are listed in a table (manual_corrections_path), 1 row per correction:
+# - step: the step of the scripts where the correction is applied
+#   (geonames, province_matches and unmatched_locations in script 3, geocoded_events in script 6)
+# - action: rename (Location -> new_Location), set_coordinates (Longitude, Latitude),
+#   drop (the location) or drop_event (all the locations of the event)
+# - DisNo. and Location: the event and the location name the correction applies to
+# Each action is applied to all its rows at once, by hash lookup of (DisNo., Location).
+
+import pandas as pd
+
+from .paths import get_path
+
+KEY_COLUMNS = ["DisNo.", "Location"]
+
+
+def read_corrections(path=None):
+    """
+    Read the table of manual corrections.
+
+    Parameters:
+    - path (str, optional): The corrections table (default: manual_corrections_path).
+
+    Returns:
+    - DataFrame: The corrections.
+    """
+    if path is None:
+        path = get_path("manual_corrections_path")
+    corrections = pd.read_csv(
+        path,
+        dtype={"DisNo.": str, "Location": str, "new_Location": str},
+        keep_default_na=False,
+        na_values={"Longitude": [""], "Latitude": [""]},
+    )
+    duplicated = corrections.duplicated(["step", "action"] + KEY_COLUMNS)
+    if duplicated.any():
+        raise ValueError(
+            f"Duplicated manual corrections:\n{corrections[duplicated].to_string()}"
+        )
+    return corrections
+
+
+def _select(corrections, step, action):
+    return corrections[
+        (corrections["step"] == step) & (corrections["action"] == action)
+    ].set_index(KEY_COLUMNS)
+
+
+def _lookup(df, corrections, column):
+    # value of the correction of each row of df (NaN for the rows without correction)
+    keys = pd.MultiIndex.from_frame(df[KEY_COLUMNS])
+    return corrections[column].reindex(keys).to_numpy()
+
+
+def apply_corrections(df, corrections, step):
+    """
+    Apply the corrections of a step to the locations of events: first the renames,
+    then the coordinates (of the locations with their new name), then the drops.
+
+    Parameters:
+    - df (DataFrame): The locations, with DisNo. and Location columns (and Longitude and
+      Latitude columns if coordinates are set).
+    - corrections (DataFrame): The corrections (see read_corrections).
+    - step (str): The step of the corrections to apply.
+
+    Returns:
+    - DataFrame: The corrected locations (a copy, with the index of df).
+    """
+    df = df.copy()
+
+    renames = _select(corrections, step, "rename")
+    if len(renames):
+        new_location = _lookup(df, renames, "new_Location")
+        df["Location"] = df["Location"].where(pd.isna(new_location), new_location)
+
+    coordinates = _select(corrections, step, "set_coordinates")
+    if len(coordinates):
+        for col in ["Longitude", "Latitude"]:
+            value = _lookup(df, coordinates, col)
+            df[col] = df[col].where(pd.isna(value), value)
+
+    drops = _select(corrections, step, "drop")
+    if len(drops):
+        df = df[~pd.MultiIndex.from_frame(df[KEY_COLUMNS]).isin(drops.index)]
+
+    return df
+
+
+def dropped_events(corrections, step):
+    """
+    The events that are dropped at a step (drop_event corrections).
+
+    Returns:
+    - list: The DisNo. of the events.
+    """
+    events = corrections[
+        (corrections["step"] == step) & (corrections["action"] == "drop_event")
+    ]
+    return list(events["DisNo."])
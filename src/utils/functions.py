@@ -3,6 +3,8 @@
 # functions for cleaning location names to be used in script 1
 from .paths import get_path
 import re
+import numpy as np
+import pandas as pd
 
 
 def split_and_clean_locations(location):
@@ -60,15 +62,96 @@ def extract_locations(row):
     return locations
 
 
-# This function checks if the input is a string and if it ends with a comma.
-# If so, it removes the trailing comma and returns the modified string.
-# Otherwise, it returns the original string as is.|
+# Split the values of a column into parts, and return 1 row per part (the other columns being
+# repeated). Each distinct value is split once, and the parts of the rows are gathered from the
+# flat array of the parts of the distinct values, without looping over the rows in Python.
+def explode_parts(df, column, split, names):
+    """
+    Parameters:
+    - df (DataFrame): The rows to split, with string values in the column.
+    - column (str): The column to split.
+    - split (function): Returns the list of parts of a value (e.g. split_and_clean_locations).
+      Rows whose value has no parts, or is missing, are dropped.
+    - names (str or list): The column receiving the parts, or the columns receiving the
+      items of each part if the parts are lists (e.g. extract_locations).
+
+    Returns:
+    - DataFrame: The rows of df repeated for each part, with a new index.
+    """
+    codes, uniques = pd.factorize(df[column])
+    unique_parts = [split(value) for value in uniques]
+    # parts of the distinct values, one after the other, and offset of each value
+    flat_parts = np.empty(sum(len(parts) for parts in unique_parts), dtype=object)
+    flat_parts[:] = [part for parts in unique_parts for part in parts]
+    # missing values (code -1) get the last count, 0: they have no parts
+    counts = np.array([len(parts) for parts in unique_parts] + [0], dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+
+    # row of df and position in flat_parts of each part of each row
+    row_counts = counts[codes]
+    rows = np.repeat(np.arange(len(df)), row_counts)
+    first_part = np.cumsum(row_counts) - row_counts
+    positions = np.repeat(offsets[codes] - first_part, row_counts) + np.arange(
+        len(rows)
+    )
+    flat = flat_parts[positions]
 
+    if isinstance(names, str):
+        parts = pd.DataFrame({names: flat})
+    else:
+        parts = pd.DataFrame(flat.tolist(), columns=names, dtype=object)
+    exploded = {name: df[name].iloc[rows].reset_index(drop=True) for name in df}
+    exploded.update({name: parts[name] for name in parts})
+    return pd.DataFrame(exploded)
 
-def remove_str_if_last(s):
-    if isinstance(s, str) and s.endswith(","):
-        return s[:-1]
-    return s
+
+# Compile a dictionary of replacements {pattern: replacement} into a single regular expression,
+# so that a column is rewritten in one pass instead of one pass per pattern.
+# At each position, the longest pattern matches (the first one in the dictionary if equally long).
+def compile_replacements(replacements, regex=True, ignore_case=False):
+    """
+    Parameters:
+    - replacements (dict): {pattern: replacement}, as passed to pd.Series.replace.
+    - regex (bool): The patterns are regular expressions (otherwise, literal strings).
+    - ignore_case (bool): Match the patterns regardless of case.
+
+    Returns:
+    - tuple: The compiled expression, and the function returning the replacement of a match.
+    """
+    patterns = list(replacements)
+    values = list(replacements.values())
+    order = sorted(range(len(patterns)), key=lambda i: -len(patterns[i]))
+    alternatives = [
+        f"(?P<r{i}>{patterns[i] if regex else re.escape(patterns[i])})" for i in order
+    ]
+    expression = re.compile("|".join(alternatives), re.IGNORECASE if ignore_case else 0)
+    return expression, lambda match: values[int(match.lastgroup[1:])]
+
+
+def apply_replacements(series, replacements):
+    """
+    Apply compiled replacements (see compile_replacements) to a Series of strings,
+    rewriting each distinct value once.
+    """
+    expression, replace = replacements
+    codes, uniques = pd.factorize(series)
+    replaced = pd.Series(uniques, dtype=object).str.replace(
+        expression, replace, regex=True
+    )
+    # missing values (code -1) stay missing
+    return pd.Series(
+        pd.api.extensions.take(replaced.to_numpy(), codes, allow_fill=True),
+        index=series.index,
+        name=series.name,
+    )
+
+
+def map_exact(series, mapping):
+    """
+    Replace the values of a Series that are keys of a mapping (exact match, by hash lookup),
+    keeping the other values unchanged.
+    """
+    return series.map(mapping).where(series.isin(list(mapping)), series)
 
 
 # functions for geolocating event regions used in script 2
@@ -123,7 +206,14 @@ def make_request_with_rate_limiting(params):
 
 
 def get_place_coordinates_geonames(
-    place_name, iso3_code, event_id, username, retries=1, delay=1, fuzzy=0.7
+    place_name,
+    iso3_code,
+    event_id,
+    username,
+    retries=1,
+    delay=1,
+    fuzzy=0.7,
+    client=None,
 ):
     country_code = get_country_alpha2_from_iso3(iso3_code)
 
@@ -140,7 +230,11 @@ def get_place_coordinates_geonames(
                 "username": username,
                 "fuzzy": 0.7,
             }
-            response = make_request_with_rate_limiting(params)
+            # requests go through the client (geonames.GeoNamesClient) if provided
+            if client is not None:
+                response = client.request(params)
+            else:
+                response = make_request_with_rate_limiting(params)
             response.raise_for_status()
             data = response.json()
 
@@ -168,7 +262,14 @@ def get_place_coordinates_geonames(
                 if iso3_code == "SDN":
                     print("Trying with South Sudan (SSD)...")
                     return get_place_coordinates_geonames(
-                        place_name, "SSD", event_id, username, retries, delay, fuzzy
+                        place_name,
+                        "SSD",
+                        event_id,
+                        username,
+                        retries,
+                        delay,
+                        fuzzy,
+                        client,
                     )
 
         except requests.exceptions.RequestException as e:
@@ -178,9 +279,9 @@ def get_place_coordinates_geonames(
                 time.sleep(delay)
                 delay *= 2  # Exponential backoff
             else:
+                # raise the error, so that it is not taken for a place not found
                 print(f"Geocoding failed after {retries} attempts.")
-                output_na = event_id, place_name, np.nan, np.nan, np.nan, np.nan
-                return output_na
+                raise
 
     print(
         f"Place named '{place_name}' not found in country with ISO3 code '{iso3_code}'."
@@ -216,222 +317,241 @@ def find_containing_geometry(gdf, Longitude, Latitude):
         return containing_geometry
 
 
-from fuzzywuzzy import fuzz
-
-
-def calculate_similarity_ADM1(row):
-    location = str(row["Location"]) if pd.notna(row["Location"]) else ""
-    ADM1_NAME = str(row["ADM1_NAME"]) if pd.notna(row["ADM1_NAME"]) else ""
-    return fuzz.ratio(location.lower(), ADM1_NAME.lower())
+import geopandas as gpd
 
 
-# Function to calculate the similarity score between two strings
-def calculate_similarity_ADM2(row):
-    location = str(row["Location"]) if pd.notna(row["Location"]) else ""
-    ADM2_NAME = str(row["ADM2_NAME"]) if pd.notna(row["ADM2_NAME"]) else ""
-    return fuzz.ratio(location.lower(), ADM2_NAME.lower())
+def find_containing_codes(gdf, code_col, Longitude, Latitude):
+    """
+    Find, for many points at once, the code of the geometry that contains each point.
 
+    The points are matched to the geometries with a single spatial join (STRtree index),
+    instead of scanning every geometry for every point.
+    When several geometries contain a point, the first one in the GeoDataFrame is kept,
+    as in find_containing_geometry.
 
-# Function to calculate the similarity score between two strings
-def calculate_similarity_geonames(row):
-    location = str(row["Location"]) if pd.notna(row["Location"]) else ""
-    geoname = str(row["geoNames"]) if pd.notna(row["geoNames"]) else ""
-    return fuzz.ratio(location.lower(), geoname.lower())
+    Parameters:
+    gdf (GeoDataFrame): The GeoDataFrame with geometries.
+    code_col (str): The column of gdf holding the code to return (e.g. "ADM1_CODE").
+    Longitude (array-like): The longitudes of the points.
+    Latitude (array-like): The latitudes of the points.
 
+    Returns:
+    numpy.ndarray: The code of the containing geometry for each point, or "No match".
+    """
+    points = gpd.GeoDataFrame(
+        geometry=gpd.points_from_xy(np.asarray(Longitude), np.asarray(Latitude)),
+        crs=gdf.crs,
+    )
+    polygons = gdf[[code_col, "geometry"]].reset_index(drop=True)
 
-# function to find matching regions at admin level 1
-def find_matching_region_adm1(row, gaul1, threshold=80):
-    # Extract ISO code and location from the row
-    iso_code = row["ISO"]
-    regionoi = row["Location"]
+    joined = gpd.sjoin(points, polygons, how="inner", predicate="within")
+    # keep the first containing geometry (in gdf order) for each point
+    joined = joined.sort_values("index_right", kind="stable")
+    joined = joined[~joined.index.duplicated(keep="first")]
 
-    # Filter the GAUL1 DataFrame for matching ISO codes
-    gaul1_iso = gaul1[gaul1.iso3 == iso_code]
+    codes = np.full(len(points), "No match", dtype=object)
+    codes[joined.index.values] = joined[code_col].values
+    return codes
 
-    # Initialize variables to store the best match
-    best_match = None
-    best_score = threshold
 
-    # Iterate through GAUL1 regions and calculate fuzzy matching score
-    for i in np.arange(len(gaul1_iso)):
-        match_score = fuzz.ratio(
-            row["Location"].lower(), gaul1_iso.iloc[i]["ADM1_NAME"].lower()
-        )
-        if match_score > best_score:
-            best_match = gaul1_iso.iloc[i]["ADM1_NAME"]
-            best_score = match_score
+def assign_admin_codes(df, gaul1, gaul2, lon_col="Longitude", lat_col="Latitude"):
+    """
+    Assign the GAUL admin level 1 and 2 codes containing each location of a DataFrame.
 
-    # If a best match was found above the threshold, return it as a DataFrame
-    if best_match:
-        adm1code = gaul1_iso[gaul1_iso.ADM1_NAME == best_match]["ADM1_CODE"].values[0]
-        result_df = pd.DataFrame(
-            {
-                "ADM1_NAME": [best_match],
-                "ADM1_CODE": [adm1code],
-                "Score": [best_score],
-                "DisNo.": [row["DisNo."]],
-                "Location": [row["Location"]],
-                "index": [row["index"]],
-                "geoNames": [row["geoNames"]],
-                "Province": [row["Province"]],
-                "ISO": [row["ISO"]],
-            }
-        )
-        return result_df
+    Parameters:
+    df (DataFrame): The locations, with longitude and latitude columns.
+    gaul1 (GeoDataFrame): GAUL admin level 1 geometries with an ADM1_CODE column.
+    gaul2 (GeoDataFrame): GAUL admin level 2 geometries with an ADM2_CODE column.
+    lon_col (str): The name of the longitude column.
+    lat_col (str): The name of the latitude column.
 
-    # If no match is found above the threshold, return an empty DataFrame
+    Returns:
+    DataFrame: ADM1_CODE and ADM2_CODE columns aligned with df ("No match" where no region contains the point).
+    """
     return pd.DataFrame(
-        columns=[
-            "ADM1_NAME",
-            "ADM1_CODE",
-            "Score",
-            "DisNo.",
-            "Location",
-            "index",
-            "geoNames",
-            "Province",
-            "ISO",
-        ]
+        {
+            "ADM1_CODE": find_containing_codes(
+                gaul1, "ADM1_CODE", df[lon_col], df[lat_col]
+            ),
+            "ADM2_CODE": find_containing_codes(
+                gaul2, "ADM2_CODE", df[lon_col], df[lat_col]
+            ),
+        },
+        index=df.index,
     )
 
 
-# function to find matching regions at admin level 2
-def find_matching_region_adm2(row, gaul2, threshold=80):
-    # Extract ISO code and location from the row
-    iso_code = row["ISO"]
-    regionoi = row["Location"]
-    adm1_name = row["ADM1_NAME"]
-    adm1_code = row["ADM1_CODE"]
+from rapidfuzz import fuzz as rfuzz, process as rprocess
 
-    # Filter the GAUL2 DataFrame for matching ISO codes
-    gaul2_iso = gaul2[(gaul2.iso3 == iso_code) & (gaul2.ADM1_CODE == adm1_code)]
 
-    # Initialize variables to store the best match
-    best_match = None
-    best_score = threshold
+def calculate_similarity(df, col1, col2):
+    """
+    Calculate the similarity score between two string columns for all rows at once.
 
-    # Iterate through GAUL1 regions and calculate fuzzy matching score
-    for i in np.arange(len(gaul2_iso)):
-        match_score = fuzz.ratio(
-            row["Location"].lower(), gaul2_iso.iloc[i]["ADM2_NAME"].lower()
-        )
-        if match_score > best_score:
-            best_match = gaul2_iso.iloc[i]["ADM2_NAME"]
-            best_score = match_score
+    The score is the fuzz.ratio of the lowercased strings (missing values as empty
+    strings, 0 to 100), and the pairs are scored in batch by rapidfuzz, on all cores.
 
-    # If a best match was found above the threshold, return it as a DataFrame
-    if best_match:
-        adm2code = gaul2_iso[gaul2_iso.ADM2_NAME == best_match]["ADM2_CODE"].values[0]
-        result_df = pd.DataFrame(
-            {
-                "ADM1_NAME": [adm1_name],
-                "ADM1_CODE": [adm1_code],
-                "ADM2_NAME": [best_match],
-                "ADM2_CODE": [adm2code],
-                "Score": [best_score],
-                "DisNo.": [row["DisNo."]],
-                "Location": [row["Location"]],
-                "index": [row["index"]],
-                "geoNames": [row["geoNames"]],
-                "Province": [row["Province"]],
-                "ISO": [row["ISO"]],
-            }
-        )
-        return result_df
+    Parameters:
+    df (DataFrame): The DataFrame with the two columns.
+    col1 (str): The first column (e.g. "Location").
+    col2 (str): The second column (e.g. "ADM1_NAME").
 
-    # If no match is found above the threshold, return an empty DataFrame
-    return pd.DataFrame(
-        columns=[
-            "ADM1_NAME",
-            "ADM1_CODE",
-            "ADM2_NAME",
-            "ADM2_CODE",
-            "Score",
-            "DisNo.",
-            "Location",
-            "index",
-            "geoNames",
-            "Province",
-            "ISO",
-        ]
+    Returns:
+    Series: The integer similarity score of each row.
+    """
+    strings1 = df[col1].where(df[col1].notna(), "").astype(str).str.lower()
+    strings2 = df[col2].where(df[col2].notna(), "").astype(str).str.lower()
+    scores = rprocess.cpdist(
+        strings1.tolist(), strings2.tolist(), scorer=rfuzz.ratio, workers=-1
     )
+    return pd.Series(np.rint(scores).astype(int), index=df.index)
 
 
-# function to find matching regions at admin level 1 with province identified with Geonames
-def find_match_province_adm1(row, gaul1, threshold=80):
-    # Extract ISO code and location from the row
-    iso_code = row["ISO"]
-    regionoi = row["Province"]
-
-    # Filter the GAUL1 DataFrame for matching ISO codes
-    gaul1_iso = gaul1[gaul1.iso3 == iso_code]
+def build_gaul_name_index(gaul, level):
+    """
+    Build an index of GAUL region names, grouped by country (and by admin level 1
+    region for admin level 2), to be built once and queried for many locations.
 
-    # Initialize variables to store the best match
-    best_match = None
-    best_score = threshold
+    Parameters:
+    gaul (GeoDataFrame or DataFrame): GAUL regions with iso3, ADM1_CODE and ADM<level>_NAME/CODE columns.
+    level (int): The admin level of the regions (1 or 2).
 
-    # Iterate through GAUL1 regions and calculate fuzzy matching score
-    for i in np.arange(len(gaul1_iso)):
-        match_score = fuzz.ratio(
-            row["Province"].lower(), gaul1_iso.iloc[i]["ADM1_NAME"].lower()
+    Returns:
+    dict: For each iso3 code (level 1) or (iso3, ADM1_CODE) pair (level 2), a tuple of
+    the lowercased names, the names and the codes of the regions, in GAUL order.
+    """
+    name_col, code_col = f"ADM{level}_NAME", f"ADM{level}_CODE"
+    if level == 1:
+        keys, columns = "iso3", ["iso3", name_col, code_col]
+    else:
+        keys, columns = ["iso3", "ADM1_CODE"], ["iso3", "ADM1_CODE", name_col, code_col]
+    name_index = {}
+    for key, group in gaul[columns].groupby(keys, sort=False):
+        names = group[name_col].astype(str)
+        name_index[key] = (
+            names.str.lower().tolist(),
+            names.values,
+            group[code_col].values,
         )
-        if match_score > best_score:
-            best_match = gaul1_iso.iloc[i]["ADM1_NAME"]
-            best_score = match_score
+    return name_index
 
-    # If a best match was found above the threshold, return it as a DataFrame
-    if best_match:
-        adm1code = gaul1_iso[gaul1_iso.ADM1_NAME == best_match]["ADM1_CODE"].values[0]
-        result_df = pd.DataFrame(
-            {
-                "ADM1_NAME": [best_match],
-                "ADM1_CODE": [adm1code],
-                "Score": [best_score],
-                "DisNo.": [row["DisNo."]],
-                "Province": [row["Province"]],
-                "index": [row["index"]],
-                "geoNames": [row["geoNames"]],
-                "ISO": [row["ISO"]],
-            }
-        )
-        return result_df
-    # If no match is found above the threshold, return an empty DataFrame
+
+def find_best_region_matches(df, name_index, keys, query_col, threshold=80):
+    """
+    Find, for all rows at once, the GAUL region whose name best matches a column.
+
+    The rows are grouped by index key and scored against the region names of their
+    country with one rapidfuzz cdist call per group. The score is the fuzz.ratio of
+    the lowercased names, a region must score above the threshold, and the first
+    region in GAUL order wins ties.
+
+    Parameters:
+    df (DataFrame): The locations.
+    name_index (dict): The index built with build_gaul_name_index.
+    keys (str or list): The column(s) of df matching the index keys ("ISO" or ["ISO", "ADM1_CODE"]).
+    query_col (str): The column with the names to match (e.g. "Location").
+    threshold (int): The score to exceed.
+
+    Returns:
+    DataFrame: The positions of the matched rows in df ("position") with the name,
+    code and score of their best region match.
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    by = [df[k].values for k in keys]
+    groups = pd.Series(np.arange(len(df))).groupby(
+        by[0] if len(by) == 1 else by, sort=False
+    )
+
+    positions, names, codes, scores = [], [], [], []
+    for key, group in groups:
+        if key not in name_index:
+            continue
+        lower_names, region_names, region_codes = name_index[key]
+        queries = df[query_col].iloc[group.values].astype(str).str.lower().tolist()
+        group_scores = np.rint(
+            rprocess.cdist(queries, lower_names, scorer=rfuzz.ratio, workers=-1)
+        ).astype(int)
+        # argmax returns the first region with the best score
+        best = group_scores.argmax(axis=1)
+        best_scores = group_scores[np.arange(len(best)), best]
+        matched = best_scores > threshold
+
+        positions.append(group.values[matched])
+        names.append(region_names[best[matched]])
+        codes.append(region_codes[best[matched]])
+        scores.append(best_scores[matched])
+
+    if not positions:
+        return pd.DataFrame(columns=["position", "name", "code", "score"])
     return pd.DataFrame(
-        columns=[
-            "ADM1_NAME",
-            "ADM1_CODE",
-            "Score",
-            "DisNo.",
-            "Province",
-            "index",
-            "geoNames",
-            "ISO",
-        ]
+        {
+            "position": np.concatenate(positions),
+            "name": np.concatenate(names),
+            "code": np.concatenate(codes),
+            "score": np.concatenate(scores),
+        }
+    ).sort_values("position", ignore_index=True)
+
+
+def find_retun_adm1_matches(df, gaul1, name_index=None):
+    if name_index is None:
+        name_index = build_gaul_name_index(gaul1, 1)
+    matches = find_best_region_matches(df, name_index, "ISO", "Location")
+    rows = df.iloc[matches["position"].values]
+    return pd.DataFrame(
+        {
+            "ADM1_NAME": matches["name"].values,
+            "ADM1_CODE": matches["code"].values,
+            "Score": matches["score"].values,
+            "DisNo.": rows["DisNo."].values,
+            "Location": rows["Location"].values,
+            "index": rows["index"].values,
+            "geoNames": rows["geoNames"].values,
+            "Province": rows["Province"].values,
+            "ISO": rows["ISO"].values,
+        }
     )
 
 
-def find_retun_adm1_matches(df, gaul1):
-    no_match_adm1_df = df.apply(
-        lambda row: find_matching_region_adm1(row, gaul1), axis=1
+def find_retun_adm2_matches(df, gaul2, name_index=None):
+    if name_index is None:
+        name_index = build_gaul_name_index(gaul2, 2)
+    matches = find_best_region_matches(df, name_index, ["ISO", "ADM1_CODE"], "Location")
+    rows = df.iloc[matches["position"].values]
+    return pd.DataFrame(
+        {
+            "ADM1_NAME": rows["ADM1_NAME"].values,
+            "ADM1_CODE": rows["ADM1_CODE"].values,
+            "ADM2_NAME": matches["name"].values,
+            "ADM2_CODE": matches["code"].values,
+            "Score": matches["score"].values,
+            "DisNo.": rows["DisNo."].values,
+            "Location": rows["Location"].values,
+            "index": rows["index"].values,
+            "geoNames": rows["geoNames"].values,
+            "Province": rows["Province"].values,
+            "ISO": rows["ISO"].values,
+        }
     )
-    df1_list = []
-    for dfi in no_match_adm1_df:
-        if not dfi.empty:
-            df1_list.append(dfi)
-    name_located_adm1 = pd.concat(df1_list)
-    return name_located_adm1
 
 
-def find_retun_adm2_matches(df, gaul2):
-    no_match_adm2_df = df.apply(
-        lambda row: find_matching_region_adm2(row, gaul2), axis=1
+def find_retun_province_matches(df, gaul1, name_index=None):
+    if name_index is None:
+        name_index = build_gaul_name_index(gaul1, 1)
+    matches = find_best_region_matches(df, name_index, "ISO", "Province")
+    rows = df.iloc[matches["position"].values]
+    return pd.DataFrame(
+        {
+            "ADM1_NAME": matches["name"].values,
+            "ADM1_CODE": matches["code"].values,
+            "Score": matches["score"].values,
+            "DisNo.": rows["DisNo."].values,
+            "Province": rows["Province"].values,
+            "index": rows["index"].values,
+            "geoNames": rows["geoNames"].values,
+            "ISO": rows["ISO"].values,
+        }
     )
-    df2_list = []
-    for dfi in no_match_adm2_df:
-        if not dfi.empty:
-            df2_list.append(dfi)
-    name_located_adm2 = pd.concat(df2_list)
-    return name_located_adm2
 
 
 def is_substring_in_string(substring, main_string):
@@ -495,14 +615,65 @@ def find_regionname_adm2(row):
     )
 
 
-# Function to calculate the similarity score between two strings
-def calculate_similarity_location_province(row):
-    location = str(row["Location"]) if pd.notna(row["Location"]) else ""
-    province = str(row["Province"]) if pd.notna(row["Province"]) else ""
-    return fuzz.ratio(location.lower(), province.lower())
+# Functions used in script 4
 
 
-# Functions used in script 4
+import ast
+import json
+
+
+# Parse one 'Admin Units' string (a JSON list of admin units) without evaluating code
+def load_admin_units(units):
+    try:
+        return json.loads(units)
+    except ValueError:
+        return ast.literal_eval(units)
+
+
+def parse_admin_units(admin_units):
+    """
+    Parse the 'Admin Units' column of EM-DAT into a long table of admin units.
+
+    The whole column is parsed with a single JSON call (falling back to a safe
+    row-wise parsing if some entries are not valid JSON). Within each event and
+    admin level, the units are sorted by name, as in process_admin_units.
+
+    Parameters:
+    admin_units (Series): The 'Admin Units' column, indexed by DisNo.
+
+    Returns:
+    DataFrame: One row per event and admin unit, with the DisNo., admin_level (1 or 2),
+    position (rank of the unit within the event and level), code and name columns.
+    """
+    units = admin_units.dropna()
+    try:
+        parsed = json.loads("[" + ",".join(units) + "]")
+    except ValueError:
+        parsed = [load_admin_units(u) for u in units]
+
+    exploded = pd.Series(parsed, index=units.index, dtype=object).explode().dropna()
+    records = pd.DataFrame(exploded.tolist(), index=exploded.index).reindex(
+        columns=["adm1_code", "adm1_name", "adm2_code", "adm2_name"]
+    )
+
+    levels = []
+    for level in [1, 2]:
+        level_units = records[[f"adm{level}_code", f"adm{level}_name"]].dropna(
+            subset=[f"adm{level}_code"]
+        )
+        level_units.columns = ["code", "name"]
+        level_units.insert(0, "admin_level", level)
+        levels.append(level_units)
+
+    long_units = pd.concat(levels).rename_axis("DisNo.").reset_index()
+    long_units["code"] = long_units["code"].astype(np.int64)
+    long_units = long_units.sort_values(
+        ["DisNo.", "admin_level", "name"], kind="stable", ignore_index=True
+    )
+    long_units.insert(
+        2, "position", long_units.groupby(["DisNo.", "admin_level"]).cumcount()
+    )
+    return long_units
 
 
 # Process 'Admin Units' column to get Admin1 Code, Admin2 Code, and Geo Locations
@@ -514,7 +685,7 @@ def process_admin_units(units):
     admin2_units = []
 
     # Extract Admin1 and Admin2 information
-    for unit in eval(units):
+    for unit in load_admin_units(units):
         if "adm1_code" in unit:
             admin1_units.append((unit["adm1_code"], unit["adm1_name"]))
         if "adm2_code" in unit:
@@ -554,31 +725,563 @@ def fix_invalid_geometry(geometry):
     return geometry
 
 
-def check_bounding_box_containment(gdf):
-    # Get the bounding boxes for each geometry
-    bounding_boxes = gdf.bounds
+import shapely
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _prepare_geometry_array(geometries, tolerance):
+    if tolerance:
+        geometries = shapely.simplify(geometries, tolerance)
+    # fix invalid geometries as fix_invalid_geometry, with a buffer of 0
+    invalid = ~shapely.is_valid(geometries) & ~shapely.is_missing(geometries)
+    if invalid.any():
+        # copy, the array may share its memory with the geometries of the caller
+        geometries = np.array(geometries, dtype=object, copy=True)
+        geometries[invalid] = shapely.buffer(geometries[invalid], 0)
+    return geometries
+
+
+def prepare_geometries(geometries, tolerance=0.005, max_workers=1, chunksize=2000):
+    """
+    Simplify geometries and fix the invalid ones, with shapely array functions.
 
-    for i in range(len(gdf)):
-        for j in range(len(gdf)):
-            if i != j:  # Avoid comparing a geometry with itself
-                # Get bounding boxes for geometry i and geometry j
-                bbox_i = bounding_boxes.iloc[i]
-                bbox_j = bounding_boxes.iloc[j]
+    Parameters:
+    - geometries (GeoSeries): The geometries to prepare.
+    - tolerance (float): The simplification tolerance (0 or None to keep the geometries as is).
+    - max_workers (int): The number of processes (1 to prepare the geometries in this process).
+    - chunksize (int): The number of geometries sent to a process at once.
 
-                # Check if bbox_i is contained within bbox_j
-                contained = (
-                    bbox_i["minx"] >= bbox_j["minx"]
-                    and bbox_i["miny"] >= bbox_j["miny"]
-                    and bbox_i["maxx"] <= bbox_j["maxx"]
-                    and bbox_i["maxy"] <= bbox_j["maxy"]
+    Returns:
+    - GeoSeries: The prepared geometries, with the same index and CRS.
+    """
+    values = np.asarray(geometries.values, dtype=object)
+    if max_workers > 1 and len(values) > chunksize:
+        chunks = [
+            values[start : start + chunksize]
+            for start in range(0, len(values), chunksize)
+        ]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            prepared = np.concatenate(
+                list(
+                    executor.map(
+                        _prepare_geometry_array, chunks, [tolerance] * len(chunks)
+                    )
                 )
+            )
+    else:
+        prepared = _prepare_geometry_array(values, tolerance)
+    return gpd.GeoSeries(prepared, index=geometries.index, crs=geometries.crs)
+
+
+def find_bounding_box_containment_events(gdf, event_col="DisNo."):
+    """
+    Find the events in which the bounding box of a location is contained in the bounding
+    box of another location of the same event. The candidate pairs are found with a
+    spatial index, in which the boxes of each event are shifted apart along x so that
+    only the boxes of the same event can intersect.
+
+    Parameters:
+    - gdf (GeoDataFrame): The locations of the events.
+    - event_col (str): The column identifying the events.
+
+    Returns:
+    - ndarray: The identifiers of the events with a contained bounding box.
+    """
+    bounds = gdf.bounds.to_numpy()
+    events, event_index = np.unique(gdf[event_col].to_numpy(), return_inverse=True)
+
+    # empty geometries have no bounding box and are never contained
+    valid = np.flatnonzero(~np.isnan(bounds).any(axis=1))
+    if len(valid) < 2:
+        return events[:0]
+    bounds = bounds[valid]
+    event_index = event_index[valid]
+
+    # the shift is monotonic, so the contained boxes still intersect after it
+    width = bounds[:, 2].max() - bounds[:, 0].min() + 1
+    shift = event_index * width
+    boxes = shapely.box(
+        bounds[:, 0] + shift, bounds[:, 1], bounds[:, 2] + shift, bounds[:, 3]
+    )
+    i, j = shapely.STRtree(boxes).query(boxes)
+
+    bbox_i = bounds[i]
+    bbox_j = bounds[j]
+    contained = (
+        (i != j)
+        & (event_index[i] == event_index[j])
+        & (bbox_i[:, 0] >= bbox_j[:, 0])
+        & (bbox_i[:, 1] >= bbox_j[:, 1])
+        & (bbox_i[:, 2] <= bbox_j[:, 2])
+        & (bbox_i[:, 3] <= bbox_j[:, 3])
+    )
+    return events[np.unique(event_index[i[contained]])]
+
+
+def find_redundant_admin1_locations(gdf, event_col="DisNo."):
+    """
+    Find the admin 1 locations that are redundant with other locations of their event:
+    in the events with a contained bounding box, the admin 1 locations whose ADM1_CODE
+    appears more than once in the event.
+
+    Parameters:
+    - gdf (GeoDataFrame): The locations of the events, with ADM1_CODE and admin_level columns.
+    - event_col (str): The column identifying the events.
 
-                if contained:
-                    return np.unique(
-                        gdf["DisNo."].values[0]
-                    )  # Return True as soon as containment is detected
+    Returns:
+    - Index: The index labels of the redundant locations.
+    """
+    flagged = gdf[event_col].isin(find_bounding_box_containment_events(gdf, event_col))
+    redundant = (
+        flagged
+        & (gdf["admin_level"] == 1)
+        & gdf.duplicated(subset=[event_col, "ADM1_CODE"], keep=False)
+    )
+    return gdf.index[redundant]
+
+
+def event_region_codes(df):
+    """
+    GAUL code of the region of each location: ADM2_CODE for admin 2 locations,
+    ADM1_CODE for admin 1 locations.
 
-    return None  # Return False if no containment is found
+    Parameters:
+    - df (DataFrame): The locations, with ADM1_CODE, ADM2_CODE and admin_level columns.
+
+    Returns:
+    - ndarray: The region codes (int64).
+    """
+    return np.where(df["admin_level"] == 2, df["ADM2_CODE"], df["ADM1_CODE"]).astype(
+        np.int64
+    )
+
+
+def normalize_event_locations(gdf):
+    """
+    Split the event locations into a table of locations without geometries and a
+    deduplicated table of region geometries, keyed by admin_level and ADM_CODE
+    (see materialize_event_locations to join them back).
+
+    Parameters:
+    - gdf (GeoDataFrame): The event locations with the GAUL geometries.
+
+    Returns:
+    - tuple: The locations (DataFrame) and the regions (GeoDataFrame).
+    """
+    locations = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+    regions = gpd.GeoDataFrame(
+        {
+            "admin_level": gdf["admin_level"].astype(np.int64).values,
+            "ADM_CODE": event_region_codes(gdf),
+        },
+        geometry=gdf.geometry.values,
+        crs=gdf.crs,
+    )
+    regions = regions.drop_duplicates(subset=["admin_level", "ADM_CODE"])
+    return locations, regions.reset_index(drop=True)
+
+
+def materialize_event_locations(locations, regions, events=None):
+    """
+    Join the region geometries to the event locations (see normalize_event_locations).
+
+    Parameters:
+    - locations (DataFrame): The event locations without geometries.
+    - regions (GeoDataFrame): The region geometries, keyed by admin_level and ADM_CODE.
+    - events (list, optional): The DisNo. of the events to materialize (default: all).
+
+    Returns:
+    - GeoDataFrame: The event locations with their geometries.
+    """
+    if events is not None:
+        locations = locations[locations["DisNo."].isin(events)]
+    keys = pd.DataFrame(
+        {
+            "admin_level": locations["admin_level"].astype(np.int64).values,
+            "ADM_CODE": event_region_codes(locations),
+        }
+    )
+    geometries = keys.merge(regions, on=["admin_level", "ADM_CODE"], how="left")
+    return gpd.GeoDataFrame(
+        locations.reset_index(drop=True),
+        geometry=geometries[regions.geometry.name].values,
+        crs=regions.crs,
+    )
+
+
+def merge_event_rows(existing, updates, replaced_events, event_col="DisNo."):
+    """
+    Merge the rows of updated events into an existing output: the rows of the replaced
+    events (new, changed or removed) are dropped, and the updated rows are appended.
+
+    Parameters:
+    - existing (GeoDataFrame): The output of the previous run.
+    - updates (GeoDataFrame): The rows of the new and changed events.
+    - replaced_events (list): The events whose rows are replaced.
+    - event_col (str): The column identifying the events.
+
+    Returns:
+    - GeoDataFrame: The merged rows, sorted by event.
+    """
+    kept = existing[~existing[event_col].isin(replaced_events)]
+    merged = pd.concat([kept, updates], ignore_index=True)
+    merged = merged.sort_values(event_col, kind="stable", ignore_index=True)
+    return gpd.GeoDataFrame(merged, geometry="geometry", crs=existing.crs)
+
+
+# Functions used in script 5
+
+
+def _union_geometry_groups(geometry_groups):
+    return [shapely.union_all(geometries) for geometries in geometry_groups]
+
+
+def union_by_group(geometries, groups, max_workers=1):
+    """
+    Union the geometries of each group with shapely.union_all, the groups being
+    dealt (largest first) to a process pool.
+
+    Parameters:
+    - geometries (ndarray): The geometries.
+    - groups (list): The positions of the geometries of each group (arrays of int).
+    - max_workers (int): The number of processes (1 to union the groups in this process).
+
+    Returns:
+    - list: The union of each group, in the order of the groups.
+    """
+    if max_workers <= 1 or len(groups) < 2:
+        return _union_geometry_groups([geometries[group] for group in groups])
+
+    # largest groups first, dealt to batches of similar total size
+    order = sorted(range(len(groups)), key=lambda i: len(groups[i]), reverse=True)
+    n_batches = min(len(groups), max_workers * 4)
+    batches = [order[k::n_batches] for k in range(n_batches)]
+
+    unions = [None] * len(groups)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            _union_geometry_groups,
+            [[geometries[groups[i]] for i in batch] for batch in batches],
+        )
+        for batch, batch_unions in zip(batches, results):
+            for i, union in zip(batch, batch_unions):
+                unions[i] = union
+    return unions
+
+
+import sqlite3
+from collections import OrderedDict
+
+
+class UnionCache:
+    """
+    Cache of the unions of sets of regions, keyed by the sorted region keys, kept in
+    memory (least recently used entries are evicted) and optionally in a SQLite file.
+
+    Entries are stored per version of the region geometries, so unions computed from
+    different geometries never mix. The entries of other versions are deleted when the
+    cache is opened, so the file does not grow with every version.
+
+    Parameters:
+    - db_path (str, optional): Path of the SQLite file (None: memory only).
+    - version (str): Version of the region geometries.
+    - maxsize (int): The number of unions kept in memory.
+    """
+
+    def __init__(self, db_path=None, version="", maxsize=10000):
+        self.version = version
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.con = None
+        if db_path is not None:
+            self.con = sqlite3.connect(db_path)
+            self.con.execute("PRAGMA journal_mode=WAL")
+            self.con.execute("PRAGMA synchronous=NORMAL")
+            self.con.execute(
+                """CREATE TABLE IF NOT EXISTS union_cache (
+                    regions TEXT,
+                    version TEXT,
+                    geometry BLOB,
+                    PRIMARY KEY (regions, version)
+                )"""
+            )
+            deleted = self.con.execute(
+                "DELETE FROM union_cache WHERE version != ?", [version]
+            ).rowcount
+            self.con.commit()
+            if deleted > 0:
+                # give the space of the deleted entries back
+                self.con.execute("VACUUM")
+
+    def close(self):
+        if self.con is not None:
+            self.con.close()
+
+    def _remember(self, key, geometry):
+        self.memory[key] = geometry
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def get(self, regions):
+        """
+        Return the cached union of a tuple of sorted region keys, or None if it is not cached.
+        """
+        key = ",".join(regions)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        if self.con is None:
+            return None
+        row = self.con.execute(
+            "SELECT geometry FROM union_cache WHERE regions = ? AND version = ?",
+            [key, self.version],
+        ).fetchone()
+        if row is None:
+            return None
+        geometry = shapely.from_wkb(row[0])
+        self._remember(key, geometry)
+        return geometry
+
+    def set_many(self, unions):
+        """
+        Cache the unions of a dict {tuple of sorted region keys: geometry}.
+        """
+        for regions, geometry in unions.items():
+            self._remember(",".join(regions), geometry)
+        if self.con is not None and unions:
+            self.con.executemany(
+                "INSERT OR REPLACE INTO union_cache VALUES (?, ?, ?)",
+                [
+                    [",".join(regions), self.version, shapely.to_wkb(geometry)]
+                    for regions, geometry in unions.items()
+                ],
+            )
+            self.con.commit()
+
+
+def cached_union_by_group(
+    geometries, region_keys, groups, cache, block_size=32, max_workers=1
+):
+    """
+    Union the regions of each group as union_by_group, reusing the unions of the sets
+    of regions already computed for other groups (or previous runs) from a UnionCache.
+
+    The geometry of a region is taken from its first row. Sets of more than block_size
+    regions are built from the unions of blocks of block_size regions (in key order),
+    which are cached too, so that large recurring footprints share their blocks.
+
+    Parameters:
+    - geometries (ndarray): The geometries of the rows.
+    - region_keys (ndarray): The region key of each row (str, e.g. "1:1234").
+    - groups (list): The positions of the rows of each group (arrays of int).
+    - cache (UnionCache): The cache of unions.
+    - block_size (int): The number of regions of the blocks of large sets.
+    - max_workers (int): The number of processes used for the unions.
+
+    Returns:
+    - list: The union of each group, in the order of the groups.
+    """
+    regions, first_rows = np.unique(region_keys, return_index=True)
+    region_geometries = geometries[first_rows]
+    region_positions = {region: i for i, region in enumerate(regions)}
+
+    def resolve(region_sets):
+        unions = {}
+        missing = []
+        for region_set in dict.fromkeys(region_sets):
+            union = cache.get(region_set)
+            if union is None:
+                missing.append(region_set)
+            else:
+                unions[region_set] = union
+
+        small = [region_set for region_set in missing if len(region_set) <= block_size]
+        large = [region_set for region_set in missing if len(region_set) > block_size]
+
+        computed = dict(
+            zip(
+                small,
+                union_by_group(
+                    region_geometries,
+                    [
+                        np.array([region_positions[r] for r in region_set])
+                        for region_set in small
+                    ],
+                    max_workers,
+                ),
+            )
+        )
+
+        if large:
+            blocks = {
+                region_set: [
+                    region_set[k : k + block_size]
+                    for k in range(0, len(region_set), block_size)
+                ]
+                for region_set in large
+            }
+            block_unions = resolve([b for bs in blocks.values() for b in bs])
+            block_geometries = np.array(list(block_unions.values()), dtype=object)
+            block_positions = {b: i for i, b in enumerate(block_unions)}
+            computed.update(
+                zip(
+                    large,
+                    union_by_group(
+                        block_geometries,
+                        [
+                            np.array([block_positions[b] for b in bs])
+                            for bs in blocks.values()
+                        ],
+                        max_workers,
+                    ),
+                )
+            )
+
+        cache.set_many(computed)
+        unions.update(computed)
+        return unions
+
+    region_sets = [tuple(sorted(set(region_keys[group]))) for group in groups]
+    unions = resolve(region_sets)
+    return [unions[region_set] for region_set in region_sets]
+
+
+def dissolve_events(
+    gdf, by, aggfunc, sep=" - ", max_workers=1, union_cache=None, block_size=32
+):
+    """
+    Dissolve the locations of each event into one geometry, as GeoDataFrame.dissolve,
+    with vectorized aggregations of the attributes.
+
+    Parameters:
+    - gdf (GeoDataFrame): The locations, with the column (or index level) by.
+    - by (str): The column identifying the events.
+    - aggfunc (dict): The aggregation of each attribute column:
+      "join" joins the sorted unique values (as strings) with sep,
+      "first" takes the smallest value and "max" the largest value as a string.
+    - sep (str): The separator of the joined values.
+    - max_workers (int): The number of processes used for the unions of geometries.
+    - union_cache (UnionCache, optional): Reuse the unions of the sets of regions
+      already computed (see cached_union_by_group). The rows are then identified as
+      regions by their admin_level, ADM1_CODE and ADM2_CODE columns.
+    - block_size (int): The number of regions of the blocks of large cached unions.
+
+    Returns:
+    - GeoDataFrame: One row per event, indexed by by, with the geometry and the
+      aggregated columns.
+    """
+    if by in gdf.index.names:
+        gdf = gdf.reset_index()
+    gdf = gdf[gdf[by].notna()]
+    group_codes, group_keys = pd.factorize(gdf[by], sort=True)
+
+    aggregated = {}
+    for col, how in aggfunc.items():
+        if how == "join":
+            # sorted unique (group, value) pairs, value codes following the string order
+            value_codes, uniques = pd.factorize(gdf[col].astype(str), sort=True)
+            pairs = np.unique(np.stack([group_codes, value_codes], axis=1), axis=0)
+            splits = np.flatnonzero(np.diff(pairs[:, 0])) + 1
+            aggregated[col] = [
+                sep.join(values)
+                for values in np.split(np.asarray(uniques)[pairs[:, 1]], splits)
+            ]
+        elif how == "first":
+            aggregated[col] = gdf[col].groupby(group_codes).min().values
+        elif how == "max":
+            aggregated[col] = gdf[col].astype(str).groupby(group_codes).max().values
+        else:
+            raise ValueError(f"Unknown aggregation '{how}' for column '{col}'")
+
+    groups = np.split(
+        np.argsort(group_codes, kind="stable"),
+        np.cumsum(np.bincount(group_codes))[:-1],
+    )
+    geometries = np.asarray(gdf.geometry.values, dtype=object)
+    if union_cache is None:
+        unions = union_by_group(geometries, groups, max_workers)
+    else:
+        region_keys = (
+            gdf["admin_level"].astype(np.int64).astype(str)
+            + ":"
+            + event_region_codes(gdf).astype(str)
+        ).to_numpy()
+        unions = cached_union_by_group(
+            geometries, region_keys, groups, union_cache, block_size, max_workers
+        )
+
+    # columns in the order of GeoDataFrame.dissolve, i.e. the order in which pandas returns
+    # the aggregated attributes (found on the empty frame, the functions are not called)
+    columns = (
+        gdf.drop(columns=gdf.geometry.name)
+        .iloc[:0]
+        .groupby(by)
+        .agg({col: lambda values: None for col in aggfunc})
+        .columns
+    )
+
+    index = pd.Index(group_keys, name=by)
+    return gpd.GeoDataFrame(
+        pd.DataFrame(aggregated, index=index),
+        geometry=gpd.GeoSeries(unions, index=index, crs=gdf.crs),
+    )[["geometry"] + list(columns)]
+
+
+# Functions used in script 6
+
+# WGS 84 ellipsoid: semi-major axis (m) and eccentricity
+WGS84_A = 6378137.0
+WGS84_E = np.sqrt(1 / 298.257223563 * (2 - 1 / 298.257223563))
+
+
+def _project_equal_area(coords):
+    # cylindrical equal-area projection of (lon, lat) in degrees, as EPSG:6933 up to
+    # a scaling of the axes that preserves areas
+    sin_lat = np.sin(np.radians(coords[:, 1]))
+    e_sin_lat = WGS84_E * sin_lat
+    q = (1 - WGS84_E**2) * (
+        sin_lat / (1 - e_sin_lat**2)
+        - np.log((1 - e_sin_lat) / (1 + e_sin_lat)) / (2 * WGS84_E)
+    )
+    return np.column_stack([WGS84_A * np.radians(coords[:, 0]), WGS84_A * q / 2])
+
+
+def equal_area_km2(geometries):
+    """
+    Area in km2 of geometries in longitude/latitude (EPSG:4326), in the equal-area
+    projection EPSG:6933 (as to_crs(6933).area / 1e6). The coordinates of all the
+    geometries are projected at once with NumPy, without building a new GeoDataFrame.
+
+    Parameters:
+    - geometries (GeoSeries or ndarray): The geometries.
+
+    Returns:
+    - ndarray: The areas in km2.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    return shapely.area(shapely.transform(geometries, _project_equal_area)) / 1e6
+
+
+def region_area_km2(gdf):
+    """
+    Area in km2 of the region of each event location (see equal_area_km2), computed
+    once per region (admin_level and ADM code) and shared by all the events.
+
+    Parameters:
+    - gdf (GeoDataFrame): The event locations, with ADM1_CODE, ADM2_CODE and admin_level columns.
+
+    Returns:
+    - Series: The areas in km2, with the index of gdf.
+    """
+    region_codes, _ = pd.factorize(
+        pd.MultiIndex.from_arrays(
+            [gdf["admin_level"].astype(np.int64).values, event_region_codes(gdf)]
+        )
+    )
+    _, first_rows = np.unique(region_codes, return_index=True)
+    areas = equal_area_km2(gdf.geometry.values[first_rows])
+    return pd.Series(areas[region_codes], index=gdf.index)
 
 
 import geopandas as gpd
@@ -650,6 +1353,151 @@ def compare_single_event_by_area(event_id, gdf1, gdf2, index_col, threshold=0.1)
     }
 
 
+def event_unions(gdf, index_col, event_ids, max_workers=1):
+    """
+    Union the geometries of each event, grouping the GeoDataFrame once. Events with a
+    single geometry keep it as is (as compare_single_event_by_area).
+
+    Parameters:
+    - gdf (GeoDataFrame): The dataset.
+    - index_col (str): The column identifying the events.
+    - event_ids (list): The events to union.
+    - max_workers (int): The number of processes used for the unions (see union_by_group).
+
+    Returns:
+    - ndarray: The geometry of each event (None for events missing in the dataset).
+    """
+    geometries = np.asarray(gdf.geometry.values, dtype=object)
+    positions = gdf.groupby(index_col).indices
+    unions = np.full(len(event_ids), None, dtype=object)
+
+    to_union = []
+    for i, event_id in enumerate(event_ids):
+        event_positions = positions.get(event_id)
+        if event_positions is None:
+            continue
+        if len(event_positions) == 1:
+            unions[i] = geometries[event_positions[0]]
+        else:
+            to_union.append(i)
+
+    unions[to_union] = union_by_group(
+        geometries, [positions[event_ids[i]] for i in to_union], max_workers
+    )
+    return unions
+
+
+def event_overlap_metrics(geometries1, geometries2):
+    """
+    Compare aligned arrays of event geometries by their overlap and position, with
+    shapely array functions: intersection and union areas, intersection over union
+    (IoU), Hausdorff distance and distance between centroids. Invalid geometries are
+    fixed with a buffer of 0 first. Areas and distances are in the units of the CRS.
+
+    Parameters:
+    - geometries1 (ndarray): The geometries of the events in the first dataset.
+    - geometries2 (ndarray): The geometries of the same events in the second dataset.
+
+    Returns:
+    - DataFrame: The Intersection Area, Union Area, IoU, Hausdorff Distance and
+      Centroid Distance of each event (NaN for missing geometries).
+    """
+    geometries1 = _prepare_geometry_array(np.array(geometries1, dtype=object), None)
+    geometries2 = _prepare_geometry_array(np.array(geometries2, dtype=object), None)
+
+    intersection_area = shapely.area(shapely.intersection(geometries1, geometries2))
+    # area of the union, without computing the union geometry
+    union_area = (
+        shapely.area(geometries1) + shapely.area(geometries2) - intersection_area
+    )
+    iou = np.divide(
+        intersection_area,
+        union_area,
+        out=np.zeros_like(union_area),
+        where=union_area > 0,
+    )
+    iou[np.isnan(union_area)] = np.nan
+
+    return pd.DataFrame(
+        {
+            "Intersection Area": np.round(intersection_area, decimals=3),
+            "Union Area": np.round(union_area, decimals=3),
+            "IoU": np.round(iou, decimals=3),
+            "Hausdorff Distance": np.round(
+                shapely.hausdorff_distance(geometries1, geometries2), decimals=3
+            ),
+            "Centroid Distance": np.round(
+                shapely.distance(
+                    shapely.centroid(geometries1), shapely.centroid(geometries2)
+                ),
+                decimals=3,
+            ),
+        }
+    )
+
+
+def compare_events_by_area(
+    event_ids, gdf1, gdf2, index_col, threshold=0.1, max_workers=1, overlap=False
+):
+    """
+    Compare the affected area of events between two GeoDataFrames and estimate the
+    mismatch percentage, as compare_single_event_by_area for all events at once.
+
+    Parameters:
+    - event_ids (list): The events to compare.
+    - gdf1 (GeoDataFrame): First GeoDataFrame.
+    - gdf2 (GeoDataFrame): Second GeoDataFrame.
+    - index_col (str): The column name used as a common index for events.
+    - threshold (float): The area mismatch ratio threshold (default = 0.1 or 10%).
+    - max_workers (int): The number of processes used for the unions of the events.
+    - overlap (bool): Also compare where the events are (see event_overlap_metrics).
+
+    Returns:
+    - DataFrame: One row per event (indexed by index_col) with the event ID, areas,
+      absolute and percentage differences, and mismatch flag.
+    """
+    event_ids = list(event_ids)
+    unions1 = event_unions(gdf1, index_col, event_ids, max_workers)
+    unions2 = event_unions(gdf2, index_col, event_ids, max_workers)
+
+    # missing or empty geometries have an area of 0
+    total_area_g1 = np.nan_to_num(shapely.area(unions1), nan=0)
+    total_area_g2 = np.nan_to_num(shapely.area(unions2), nan=0)
+
+    area_difference = np.abs(total_area_g1 - total_area_g2)
+    max_area = np.maximum(total_area_g1, total_area_g2)
+    mismatch_ratio = np.divide(
+        area_difference,
+        max_area,
+        out=np.zeros_like(area_difference),
+        where=max_area > 0,
+    )
+
+    comparison = pd.DataFrame(
+        {
+            "Event": event_ids,
+            "Total Area GeoD": np.round(total_area_g1, decimals=3),
+            "Total Area GDIS": np.round(total_area_g2, decimals=3),
+            "Area Difference": np.round(area_difference, decimals=3),
+            "Mismatch Ratio": np.round(mismatch_ratio, decimals=3),
+            "Mismatch Percentage": [round(r * 100, 2) for r in mismatch_ratio],
+            "Mismatch > 10%": mismatch_ratio > threshold,
+        },
+        index=pd.Index(event_ids, name=index_col),
+    )
+
+    if overlap:
+        metrics = event_overlap_metrics(unions1, unions2)
+        for col in metrics.columns:
+            comparison[col] = metrics[col].values
+
+    missing = shapely.is_missing(unions1) | shapely.is_missing(unions2)
+    if missing.any():
+        comparison.loc[missing, comparison.columns[1:]] = np.nan
+        comparison.loc[missing, "Status"] = "Missing in one dataset"
+    return comparison
+
+
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import geopandas as gpd
@@ -657,6 +1505,38 @@ from shapely.ops import unary_union
 import matplotlib.patches as mpatches  # ✅ Import for custom legend
 
 
+import os
+import tempfile
+from matplotlib.figure import Figure
+from pypdf import PdfWriter
+
+
+def _render_event_page(page):
+    # draw one page of events on a figure without pyplot (Agg/PDF canvas), and save it
+    # to its own PDF file; run in the worker processes of plot_multiple_events_to_pdf
+    fig = Figure(figsize=(12, 12))  # Fixed page size
+    axes = fig.subplots(page["grid_size"], page["grid_size"]).flatten()
+
+    for j, (event_id, g1, g2) in enumerate(page["events"]):
+        print(f"📌 Plotting event: {event_id}")
+        _draw_event(event_id, g1, g2, page["comparison_df"], axes[j])
+
+    # Hide unused subplots
+    for k in range(len(page["events"]), len(axes)):
+        axes[k].axis("off")
+
+    # ✅ Add page number to the bottom right corner
+    fig.text(
+        0.9,
+        0.02,
+        f"Page {page['page_num']} of {page['total_pages']}",
+        fontsize=10,
+        color="gray",
+    )
+    fig.savefig(page["path"], format="pdf", bbox_inches="tight")
+    return page["path"]
+
+
 def plot_multiple_events_to_pdf(
     event_ids,
     gdf1,
@@ -665,10 +1545,15 @@ def plot_multiple_events_to_pdf(
     comparison_df=None,
     output_pdf="../figures/" + "event_plots.pdf",
     plots_per_page=4,
+    pages=None,
+    max_workers=1,
 ):
     """
     Plots multiple events and saves them as a multi-page PDF with page numbers.
 
+    The geometries of the events are grouped and merged once, the pages are rendered
+    to separate PDF files (in a process pool if max_workers > 1) and merged.
+
     Parameters:
     - event_ids (list): List of event IDs to plot.
     - gdf1 (GeoDataFrame): First dataset.
@@ -677,50 +1562,72 @@ def plot_multiple_events_to_pdf(
     - comparison_df (DataFrame, optional): DataFrame containing additional information to annotate.
     - output_pdf (str): Name of the output PDF file.
     - plots_per_page (int): Number of plots per page (default: 4).
+    - pages (list, optional): Page numbers to render, starting at 1 (default: all pages).
+    - max_workers (int): Number of processes rendering the pages.
     """
 
     grid_size = int(plots_per_page**0.5)  # Square layout (e.g., 2x2 for 4 per page)
     if grid_size * grid_size < plots_per_page:
         grid_size += 1
 
-    fig_size = (12, 12)  # Fixed page size
+    event_ids = list(event_ids)
     total_pages = (
         len(event_ids) + plots_per_page - 1
     ) // plots_per_page  # Calculate total pages
-
-    with PdfPages(output_pdf) as pdf:
-        for page_num, i in enumerate(range(0, len(event_ids), plots_per_page), start=1):
-            batch_ids = event_ids[i : i + plots_per_page]
-            fig, axes = plt.subplots(grid_size, grid_size, figsize=fig_size)
-            axes = axes.flatten()
-
-            for j, event_id in enumerate(batch_ids):
-                print(f"📌 Plotting event: {event_id}")
-                plot_single_event_debug(
-                    event_id,
-                    gdf1,
-                    gdf2,
-                    index_col,
-                    comparison_df=comparison_df,
-                    ax=axes[j],
-                )
-
-            # Hide unused subplots
-            for k in range(len(batch_ids), len(axes)):
-                axes[k].axis("off")
-
-            # ✅ Add page number to the bottom right corner
-            fig.text(
-                0.9,
-                0.02,
-                f"Page {page_num} of {total_pages}",
-                fontsize=10,
-                color="gray",
+    if pages is None:
+        pages = range(1, total_pages + 1)
+    pages = [
+        page_num for page_num in sorted(set(pages)) if 1 <= page_num <= total_pages
+    ]
+
+    # events of the selected pages, merged and fixed once (as plot_single_event_debug)
+    page_events = [
+        event_ids[(page_num - 1) * plots_per_page : page_num * plots_per_page]
+        for page_num in pages
+    ]
+    selected_events = [event_id for events in page_events for event_id in events]
+    if gdf1.crs != gdf2.crs:
+        gdf2 = gdf2.to_crs(gdf1.crs)
+    unions1 = _prepare_geometry_array(
+        event_unions(gdf1, index_col, selected_events, max_workers), None
+    )
+    unions2 = _prepare_geometry_array(
+        event_unions(gdf2, index_col, selected_events, max_workers), None
+    )
+    geometries = dict(zip(selected_events, zip(unions1, unions2)))
+
+    with tempfile.TemporaryDirectory(
+        dir=os.path.dirname(os.path.abspath(output_pdf))
+    ) as page_dir:
+        page_tasks = []
+        for page_num, events in zip(pages, page_events):
+            page_comparison_df = None
+            if comparison_df is not None:
+                page_comparison_df = comparison_df[comparison_df.index.isin(events)]
+            page_tasks.append(
+                {
+                    "path": os.path.join(page_dir, f"page_{page_num}.pdf"),
+                    "page_num": page_num,
+                    "total_pages": total_pages,
+                    "grid_size": grid_size,
+                    "events": [
+                        (event_id,) + geometries[event_id] for event_id in events
+                    ],
+                    "comparison_df": page_comparison_df,
+                }
             )
 
-            # Save the figure into the PDF
-            pdf.savefig(fig, bbox_inches="tight")
-            plt.close(fig)
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                page_paths = list(executor.map(_render_event_page, page_tasks))
+        else:
+            page_paths = [_render_event_page(page) for page in page_tasks]
+
+        writer = PdfWriter()
+        for page_path in page_paths:
+            writer.append(page_path)
+        with open(output_pdf, "wb") as f:
+            writer.write(f)
 
     print(f"✅ PDF saved as {output_pdf}")
 
@@ -776,6 +1683,12 @@ def plot_single_event_debug(
     if ax is None:
         fig, ax = plt.subplots(figsize=(8, 6))
 
+    _draw_event(event_id, g1, g2, comparison_df, ax)
+
+
+def _draw_event(event_id, g1, g2, comparison_df, ax):
+    # draw the merged geometries of an event from both datasets on an axis
+
     # Plot gdf1 (Blue)
     has_g1 = g1 is not None and not g1.is_empty
     if has_g1:
@@ -826,7 +1739,3 @@ def plot_single_event_debug(
 
     # Ensure aspect ratio
     ax.set_aspect("equal", adjustable="datalim")
-
-    # If this is a standalone plot, show it
-    if ax is None:
-        plt.show()
@@ -0,0 +1,743 @@
+# module containing the GeoNames geocoding backends used in script 2
+
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import requests
+from rapidfuzz import fuzz, process
+
+from .functions import get_country_alpha2_from_iso3
+
+
+def normalize_place_name(name):
+    """
+    Normalize a place name for lookups: lowercase, accents removed, single spaces.
+
+    Parameters:
+    - name (str): The place name.
+
+    Returns:
+    - str: The normalized name ("" for missing values).
+    """
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", name).strip().lower()
+
+
+# Offline gazetteer built from the GeoNames dumps
+######################################
+# The dumps can be downloaded from https://download.geonames.org/export/dump/
+# (allCountries.zip or one <ISO2>.zip per country, and admin1CodesASCII.txt).
+
+GEONAMES_DUMP_COLUMNS = [
+    "geonameid",
+    "name",
+    "asciiname",
+    "alternatenames",
+    "latitude",
+    "longitude",
+    "feature_class",
+    "feature_code",
+    "country_code",
+    "cc2",
+    "admin1_code",
+    "admin2_code",
+    "admin3_code",
+    "admin4_code",
+    "population",
+    "elevation",
+    "dem",
+    "timezone",
+    "modification_date",
+]
+
+# administrative regions, populated places, areas and terrain features (e.g. islands)
+DEFAULT_FEATURE_CLASSES = ("A", "P", "L", "T")
+
+
+def build_geonames_gazetteer(
+    dump_path,
+    admin1_path,
+    db_path,
+    feature_classes=DEFAULT_FEATURE_CLASSES,
+    chunksize=500_000,
+):
+    """
+    Load a GeoNames dump into an indexed SQLite gazetteer.
+
+    Every place is stored once with its coordinates, admin level 1 name and population,
+    and every name variant (name, ascii name and alternate names) is indexed by
+    (country code, normalized name).
+
+    Parameters:
+    - dump_path (str): Path to allCountries.txt or a per-country <ISO2>.txt dump.
+    - admin1_path (str): Path to admin1CodesASCII.txt (admin level 1 names).
+    - db_path (str): Path of the SQLite file to create (replaced if it exists).
+    - feature_classes (tuple or None): GeoNames feature classes to keep (None keeps all).
+    - chunksize (int): Number of dump rows read at once.
+    """
+    admin1 = pd.read_csv(
+        admin1_path,
+        sep="\t",
+        header=None,
+        names=["code", "name", "asciiname", "geonameid"],
+        usecols=["code", "name"],
+        dtype=str,
+        keep_default_na=False,
+    )
+    admin1_names = dict(zip(admin1["code"], admin1["name"]))
+
+    # build into a temporary file first, so that an interrupted build is never used
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    con = sqlite3.connect(tmp_path)
+    con.execute(
+        """CREATE TABLE places (
+            geonameid INTEGER PRIMARY KEY,
+            name TEXT,
+            country_code TEXT,
+            feature_class TEXT,
+            longitude REAL,
+            latitude REAL,
+            admin1_name TEXT,
+            population INTEGER
+        )"""
+    )
+    con.execute(
+        "CREATE TABLE names (country_code TEXT, name_norm TEXT, geonameid INTEGER)"
+    )
+
+    reader = pd.read_csv(
+        dump_path,
+        sep="\t",
+        header=None,
+        names=GEONAMES_DUMP_COLUMNS,
+        usecols=[
+            "geonameid",
+            "name",
+            "asciiname",
+            "alternatenames",
+            "latitude",
+            "longitude",
+            "feature_class",
+            "country_code",
+            "admin1_code",
+            "population",
+        ],
+        dtype={"admin1_code": str, "country_code": str, "alternatenames": str},
+        keep_default_na=False,
+        na_values={"population": [""]},
+        quoting=3,  # csv.QUOTE_NONE, names may contain quotes
+        chunksize=chunksize,
+    )
+
+    for chunk in reader:
+        if feature_classes is not None:
+            chunk = chunk[chunk["feature_class"].isin(feature_classes)]
+        if chunk.empty:
+            continue
+
+        admin1_name = (chunk["country_code"] + "." + chunk["admin1_code"]).map(
+            admin1_names
+        )
+        places = pd.DataFrame(
+            {
+                "geonameid": chunk["geonameid"],
+                "name": chunk["name"],
+                "country_code": chunk["country_code"],
+                "feature_class": chunk["feature_class"],
+                "longitude": chunk["longitude"],
+                "latitude": chunk["latitude"],
+                "admin1_name": admin1_name.where(admin1_name.notna(), None),
+                "population": chunk["population"].fillna(0).astype(np.int64),
+            }
+        )
+        con.executemany(
+            "INSERT INTO places VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            places.itertuples(index=False, name=None),
+        )
+
+        # one row per name variant
+        variants = (
+            chunk["name"] + "," + chunk["asciiname"] + "," + chunk["alternatenames"]
+        ).str.split(",")
+        names = pd.DataFrame(
+            {
+                "country_code": chunk["country_code"],
+                "name": variants,
+                "geonameid": chunk["geonameid"],
+            }
+        ).explode("name")
+        names["name"] = names["name"].map(normalize_place_name)
+        names = names[names["name"] != ""].drop_duplicates()
+        con.executemany(
+            "INSERT INTO names VALUES (?, ?, ?)",
+            names.itertuples(index=False, name=None),
+        )
+        con.commit()
+
+    con.execute("CREATE INDEX names_country_name ON names (country_code, name_norm)")
+    con.commit()
+    con.close()
+    os.replace(tmp_path, db_path)
+
+
+class GeoNamesGazetteer:
+    """
+    Offline lookup of place names in a gazetteer built with build_geonames_gazetteer.
+
+    Exact matches of the normalized name are returned first. Otherwise, the names of the
+    country starting with the same characters are scored with a fuzzy ratio, and the best
+    candidate above the fuzzy threshold is returned. Ties are broken in favour of
+    administrative regions, then of the most populated place.
+    """
+
+    def __init__(self, db_path, prefix_length=3):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"No GeoNames gazetteer found at {db_path}")
+        self.con = sqlite3.connect(db_path, check_same_thread=False)
+        self.prefix_length = prefix_length
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.con.close()
+
+    def _best_place(self, country_code, name):
+        return self.con.execute(
+            """SELECT p.longitude, p.latitude, p.name, p.admin1_name
+            FROM names n JOIN places p ON p.geonameid = n.geonameid
+            WHERE n.country_code = ? AND n.name_norm = ?
+            ORDER BY p.feature_class = 'A' DESC, p.population DESC
+            LIMIT 1""",
+            [country_code, name],
+        ).fetchone()
+
+    def search(self, place_name, country_code, fuzzy=0.7):
+        """
+        Find the best matching place in a country.
+
+        Parameters:
+        - place_name (str): The place name to look up.
+        - country_code (str): The ISO2 country code.
+        - fuzzy (float): Minimum similarity (0 to 1) accepted for non-exact matches.
+
+        Returns:
+        - tuple or None: (lng, lat, name, adminName1) of the best match.
+        """
+        name = normalize_place_name(place_name)
+        if not name:
+            return None
+        with self._lock:
+            return self._search(name, country_code, fuzzy)
+
+    def _search(self, name, country_code, fuzzy):
+        row = self._best_place(country_code, name)
+        if row is None:
+            candidates = [
+                c
+                for (c,) in self.con.execute(
+                    """SELECT DISTINCT name_norm FROM names
+                    WHERE country_code = ? AND name_norm >= ? AND name_norm < ?""",
+                    [
+                        country_code,
+                        name[: self.prefix_length],
+                        name[: self.prefix_length] + "\uffff",
+                    ],
+                )
+            ]
+            match = process.extractOne(
+                name, candidates, scorer=fuzz.ratio, score_cutoff=fuzzy * 100
+            )
+            if match is None:
+                return None
+            row = self._best_place(country_code, match[0])
+        return row
+
+
+def get_place_coordinates_gazetteer(
+    place_name, iso3_code, event_id, gazetteer, fuzzy=0.7
+):
+    """
+    Offline equivalent of functions.get_place_coordinates_geonames.
+
+    Parameters:
+    - place_name (str): The place name to geocode.
+    - iso3_code (str): The ISO3 code of the country.
+    - event_id (str): The EM-DAT event number (DisNo.).
+    - gazetteer (GeoNamesGazetteer): The offline gazetteer.
+    - fuzzy (float): Minimum similarity (0 to 1) accepted for non-exact matches.
+
+    Returns:
+    - tuple: (event_id, place_name, lng, lat, name, adminName1), with NaNs if not found.
+    """
+    country_code = get_country_alpha2_from_iso3(iso3_code)
+
+    if not country_code:
+        print(f"Invalid ISO3 code '{iso3_code}'. Unable to find country code.")
+        return ""
+
+    place = gazetteer.search(place_name, country_code, fuzzy=fuzzy)
+    if place is not None:
+        lng, lat, name, adm1 = place
+        return event_id, place_name, float(lng), float(lat), name, adm1
+
+    # Special condition: If SDN fails, try SSD
+    if iso3_code == "SDN":
+        print("Trying with South Sudan (SSD)...")
+        return get_place_coordinates_gazetteer(
+            place_name, "SSD", event_id, gazetteer, fuzzy
+        )
+
+    print(
+        f"Place named '{place_name}' not found in country with ISO3 code '{iso3_code}'."
+    )
+    return event_id, place_name, np.nan, np.nan, np.nan, np.nan
+
+
+# Persistent cache of geocoding results
+######################################
+
+
+class GeocodingCache:
+    """
+    SQLite cache of geocoding results keyed by (normalized place name, ISO3 code).
+
+    Places that were not found are cached too (negative results), with their own
+    time-to-live so that they are retried after a while. Entries are stored per version,
+    so results from different backends or settings never mix.
+
+    Parameters:
+    - db_path (str): Path of the SQLite file (created if missing).
+    - version (str): Version of the results (e.g. the backend name).
+    - ttl_days (float or None): Age after which found places expire (None: never).
+    - negative_ttl_days (float or None): Age after which places not found expire (None: never).
+    """
+
+    def __init__(self, db_path, version="api", ttl_days=None, negative_ttl_days=30):
+        self.con = sqlite3.connect(db_path, check_same_thread=False)
+        # write-ahead log: every result is committed without a full sync of the database
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.version = version
+        self.ttl_days = ttl_days
+        self.negative_ttl_days = negative_ttl_days
+        self.con.execute(
+            """CREATE TABLE IF NOT EXISTS geocoding_cache (
+                name_norm TEXT,
+                iso3 TEXT,
+                version TEXT,
+                found INTEGER,
+                longitude REAL,
+                latitude REAL,
+                name TEXT,
+                admin1_name TEXT,
+                created REAL,
+                PRIMARY KEY (name_norm, iso3, version)
+            )"""
+        )
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+    def _expired(self, found, created):
+        ttl_days = self.ttl_days if found else self.negative_ttl_days
+        return ttl_days is not None and time.time() - created > ttl_days * 86400
+
+    def get(self, place_name, iso3_code):
+        """
+        Return the cached (lng, lat, name, adminName1) of a place, with NaNs if it was
+        not found, or None if the place is not cached (or the entry expired).
+        """
+        row = self.con.execute(
+            """SELECT found, longitude, latitude, name, admin1_name, created
+            FROM geocoding_cache WHERE name_norm = ? AND iso3 = ? AND version = ?""",
+            [normalize_place_name(place_name), iso3_code, self.version],
+        ).fetchone()
+        if row is None or self._expired(row[0], row[5]):
+            return None
+        if not row[0]:
+            return np.nan, np.nan, np.nan, np.nan
+        return row[1], row[2], row[3], row[4]
+
+    def set(self, place_name, iso3_code, result):
+        """
+        Cache the result of a geocoding function (the (event_id, place_name, lng, lat,
+        name, adminName1) tuple). Results without coordinates are cached as not found:
+        geocoding functions must raise an error instead when the lookup itself failed.
+        """
+        found = len(result) == 6 and not pd.isna(result[2])
+        lng, lat, name, adm1 = result[2:] if found else (None, None, None, None)
+        self.con.execute(
+            "INSERT OR REPLACE INTO geocoding_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                normalize_place_name(place_name),
+                iso3_code,
+                self.version,
+                int(found),
+                lng,
+                lat,
+                name,
+                adm1,
+                time.time(),
+            ],
+        )
+        self.con.commit()
+
+
+def geocode_unique_locations(
+    df,
+    geocode,
+    cache,
+    location_col="Location",
+    iso_col="ISO",
+    event_col="DisNo.",
+    max_workers=1,
+):
+    """
+    Geocode each unique (place name, ISO3 code) pair of a DataFrame once, and fan the
+    results back out to all its rows.
+
+    Pairs already in the cache are not geocoded again, so an interrupted run resumes
+    where it stopped. Pairs whose geocoding raised an error (e.g. a network error) are
+    neither cached nor returned, so that they are geocoded again by the next run.
+
+    Parameters:
+    - df (DataFrame): The locations to geocode.
+    - geocode (callable): Geocoding function called as geocode(place_name, iso3_code, event_id)
+      and returning an (event_id, place_name, lng, lat, name, adminName1) tuple.
+    - cache (GeocodingCache): The cache of geocoding results.
+    - location_col, iso_col, event_col (str): The place name, ISO3 and event columns.
+    - max_workers (int): Number of locations geocoded concurrently (geocode must be thread-safe).
+
+    Returns:
+    - DataFrame: The DisNo., EM-DAT-Location, Longitude, Latitude, geoNames and Province
+      columns, one row per row of df (except the rows whose geocoding failed).
+    """
+    locations = df[location_col].astype(str).str.strip()
+    keys = pd.DataFrame(
+        {"name_norm": locations.map(normalize_place_name), "iso3": df[iso_col]}
+    )
+    unique_keys = ~keys.duplicated()
+
+    results = {}
+    to_geocode = []
+    for i in np.flatnonzero(unique_keys.values):
+        place_name, iso3_code = locations.iloc[i], df[iso_col].iloc[i]
+        cached = cache.get(place_name, iso3_code)
+        if cached is None:
+            to_geocode.append((place_name, iso3_code, df[event_col].iloc[i]))
+        else:
+            results[(keys["name_norm"].iloc[i], iso3_code)] = cached
+    print(f"{len(results)} locations found in the cache, {len(to_geocode)} to geocode")
+
+    # geocode the missing locations, results are cached as soon as they arrive
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(geocode, *query): query for query in to_geocode}
+        for k, future in enumerate(as_completed(futures)):
+            place_name, iso3_code, _ = futures[future]
+            print(k, "/", len(to_geocode))
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Geocoding of '{place_name}' ({iso3_code}) failed: {e}")
+                continue
+            cache.set(place_name, iso3_code, result)
+            results[(normalize_place_name(place_name), iso3_code)] = cache.get(
+                place_name, iso3_code
+            )
+
+    geocoded = np.array(
+        [key in results for key in zip(keys["name_norm"], keys["iso3"])], dtype=bool
+    )
+    coordinates = pd.DataFrame(
+        [
+            results[key]
+            for key in zip(keys["name_norm"][geocoded], keys["iso3"][geocoded])
+        ],
+        columns=["Longitude", "Latitude", "geoNames", "Province"],
+    )
+    return pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "DisNo.": df[event_col].values[geocoded],
+                    "EM-DAT-Location": locations.values[geocoded],
+                }
+            ),
+            coordinates,
+        ],
+        axis=1,
+    )
+
+
+# Concurrent GeoNames API client
+######################################
+
+GEONAMES_SEARCH_URL = "http://api.geonames.org/searchJSON"
+
+# GeoNames status codes returned when the hourly, daily or weekly credits are exhausted
+GEONAMES_QUOTA_STATUS = {18: 86400, 19: 3600, 20: 7 * 86400}
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `capacity` requests per `period` seconds, refilled continuously.
+    """
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds to wait before a token is available (0 if one is available now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class GeoNamesCredential:
+    """A GeoNames username with its hourly and daily request budgets."""
+
+    def __init__(self, username, hourly_limit, daily_limit):
+        self.username = username
+        self.buckets = [
+            TokenBucket(hourly_limit, 3600),
+            TokenBucket(daily_limit, 86400),
+        ]
+        self.blocked_until = 0.0
+
+    def wait_time(self, now):
+        return max(self.blocked_until - now, *(b.wait_time(now) for b in self.buckets))
+
+    def consume(self):
+        for bucket in self.buckets:
+            bucket.consume()
+
+
+class GeoNamesClient:
+    """
+    Thread-safe GeoNames API client with token-bucket rate limiting.
+
+    Requests share a pool of keep-alive connections and are spread over several
+    usernames, each with its own hourly and daily budget. A request only waits when
+    every username has used up its budget, instead of sleeping after every call.
+    When GeoNames reports that the credits of a username are exhausted, the username
+    is paused for the corresponding period and the request is sent with another one.
+
+    Parameters:
+    - usernames (list of str): The GeoNames usernames.
+    - hourly_limit (int): Maximum number of requests per hour and username.
+    - daily_limit (int): Maximum number of requests per day and username.
+    - base_url (str): The search endpoint (e.g. a local server for testing).
+    - pool_size (int): Maximum number of pooled connections (concurrent requests).
+    - timeout (float): Request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        usernames,
+        hourly_limit=900,
+        daily_limit=9000,
+        base_url=GEONAMES_SEARCH_URL,
+        pool_size=8,
+        timeout=30,
+    ):
+        if isinstance(usernames, str):
+            usernames = [usernames]
+        self.credentials = [
+            GeoNamesCredential(u, hourly_limit, daily_limit) for u in usernames
+        ]
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def close(self):
+        self.session.close()
+
+    def _acquire(self):
+        # take a token from the next username (round robin) that has one available
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                n = len(self.credentials)
+                waits = []
+                for k in range(n):
+                    credential = self.credentials[(self._next + k) % n]
+                    wait = credential.wait_time(now)
+                    if wait <= 0:
+                        credential.consume()
+                        self._next = (self._next + k + 1) % n
+                        return credential
+                    waits.append(wait)
+            wait = min(waits)
+            print(f"Rate limit reached. Waiting for {wait:.0f} seconds...")
+            time.sleep(wait)
+
+    def request(self, params):
+        """
+        Send a search request (the username is added by the client).
+
+        Returns:
+        - requests.Response: The GeoNames response.
+        """
+        while True:
+            credential = self._acquire()
+            response = self.session.get(
+                self.base_url,
+                params={**params, "username": credential.username},
+                timeout=self.timeout,
+            )
+            try:
+                status = response.json().get("status", {}).get("value")
+            except ValueError:
+                status = None
+            if status not in GEONAMES_QUOTA_STATUS:
+                return response
+            print(f"GeoNames credits exhausted for username '{credential.username}'.")
+            with self._lock:
+                credential.blocked_until = (
+                    time.monotonic() + GEONAMES_QUOTA_STATUS[status]
+                )
+
+
+# Append-only journal of geocoded locations
+######################################
+
+GEOCODED_COLUMNS = [
+    "DisNo.",
+    "EM-DAT-Location",
+    "Longitude",
+    "Latitude",
+    "geoNames",
+    "Province",
+]
+
+
+class GeocodingJournal:
+    """
+    Append-only JSON lines file of geocoded event locations, keyed by (DisNo., location).
+
+    Records are appended in batches that are flushed and synced to disk, so an interrupted
+    run keeps every completed batch and resumes from the keys already written rather than
+    from a row offset. A partial last line left by a crash is removed when the journal is
+    opened.
+
+    Parameters:
+    - path (str): Path of the journal file (created if missing).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = set()
+        if os.path.exists(path):
+            records = read_geocoding_journal(path, repair=True)
+            self.keys = set(zip(records["DisNo."], records["EM-DAT-Location"]))
+        self.file = open(path, "a", encoding="utf-8")
+
+    def close(self):
+        self.file.close()
+
+    def contains(self, event_ids, locations):
+        """Boolean array telling which (event_id, location) pairs are already written."""
+        return np.array(
+            [key in self.keys for key in zip(event_ids, locations)], dtype=bool
+        )
+
+    def append(self, records):
+        """Append a DataFrame of geocoded locations (GEOCODED_COLUMNS) and sync it to disk."""
+        if records.empty:
+            return
+        self.file.write(
+            records[GEOCODED_COLUMNS]
+            .to_json(orient="records", lines=True, force_ascii=False)
+            .rstrip("\n")
+            + "\n"
+        )
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.keys.update(zip(records["DisNo."], records["EM-DAT-Location"]))
+
+
+def read_geocoding_journal(path, repair=False):
+    """
+    Read a GeocodingJournal file into a DataFrame.
+
+    Parameters:
+    - path (str): Path of the journal file.
+    - repair (bool): Truncate the file after the last complete record.
+
+    Returns:
+    - DataFrame: The geocoded locations (GEOCODED_COLUMNS).
+    """
+    records = []
+    valid_size = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete record")
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            valid_size += len(line)
+    if repair and valid_size < os.path.getsize(path):
+        print(f"Removing incomplete records at the end of {path}")
+        with open(path, "r+b") as f:
+            f.truncate(valid_size)
+
+    df = pd.DataFrame(records, columns=GEOCODED_COLUMNS)
+    df[["Longitude", "Latitude"]] = df[["Longitude", "Latitude"]].astype(float)
+    return df
+
+
+def _chunk_number(path):
+    match = re.search(r"q(\d+)\.csv$", path)
+    return int(match.group(1)) if match else 0
+
+
+def read_geocoded_locations(folder):
+    """
+    Read all the geocoded locations written by script 2 in a folder: journals (*.jsonl)
+    and CSV files (chunk files of earlier runs or manually corrected files).
+
+    Parameters:
+    - folder (str): The folder containing the geocoded locations.
+
+    Returns:
+    - DataFrame: The geocoded locations.
+    """
+    journals = sorted(glob.glob(os.path.join(folder, "*.jsonl")))
+    # chunk files are ordered by chunk number
+    csv_files = sorted(glob.glob(os.path.join(folder, "*.csv")), key=_chunk_number)
+    frames = [read_geocoding_journal(f) for f in journals] + [
+        pd.read_csv(f).drop(columns="Unnamed: 0", errors="ignore") for f in csv_files
+    ]
+    return pd.concat(frames, ignore_index=True)
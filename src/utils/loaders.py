@@ -0,0 +1,407 @@
+# module containing cached loaders for the input datasets used in the scripts
+
+# The input files (GAUL GeoPackages, EM-DAT workbook) are slow to parse. They are converted once
+# to Parquet files in the cache folder, named after a fingerprint of the source file,
+# so that a modified source file is converted again automatically.
+# The geolocated events written by script 4 (in either layout) are also read and written here.
+
+import glob
+import hashlib
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from .functions import (
+    event_region_codes,
+    materialize_event_locations,
+    normalize_event_locations,
+    prepare_geometries,
+)
+from .paths import get_path
+
+
+def source_fingerprint(path, content_hash=False):
+    """
+    Fingerprint of a source file, from its path, size and modification time.
+
+    Parameters:
+    - path (str): The source file.
+    - content_hash (bool): Hash the file content instead (slower, but robust to copies
+      that change the modification time).
+
+    Returns:
+    - str: A short hexadecimal fingerprint.
+    """
+    stat = os.stat(path)
+    h = hashlib.sha1()
+    if content_hash:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    else:
+        h.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def _cache_file(name, kind, fingerprint):
+    cache_dir = get_path("cache_path")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{name}_{kind}_{fingerprint}.parquet")
+
+
+def _write_parquet(df, path):
+    # write to a temporary file first, so that an interrupted write is never read
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+    # remove cached versions of older source files
+    prefix = path.rsplit("_", 1)[0]
+    for old_path in glob.glob(prefix + "_*.parquet"):
+        if old_path != path:
+            os.remove(old_path)
+
+
+def cache_geodata(source_path, name, content_hash=False):
+    """
+    Convert a geographic file (e.g. GPKG) to GeoParquet in the cache folder, together
+    with a slim table of its attributes and bounding boxes, without geometries.
+    Nothing is done if the cache is up to date with the source file.
+
+    Parameters:
+    - source_path (str): The source file.
+    - name (str): The name of the dataset in the cache.
+    - content_hash (bool): Fingerprint the source file by content instead of modification time.
+
+    Returns:
+    - tuple: The paths of the GeoParquet file and of the attributes table.
+    """
+    fingerprint = source_fingerprint(source_path, content_hash)
+    geometry_path = _cache_file(name, "geometry", fingerprint)
+    attributes_path = _cache_file(name, "attributes", fingerprint)
+
+    if not (os.path.exists(geometry_path) and os.path.exists(attributes_path)):
+        print(f"Caching {source_path}")
+        gdf = gpd.read_file(source_path)
+        attributes = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+        attributes = pd.concat([attributes, gdf.bounds], axis=1)
+        _write_parquet(gdf, geometry_path)
+        _write_parquet(attributes, attributes_path)
+
+    return geometry_path, attributes_path
+
+
+def read_cached_geodata(source_path, name, columns=None, geometry=True):
+    """
+    Read a geographic file through the cache (see cache_geodata).
+
+    Parameters:
+    - source_path (str): The source file.
+    - name (str): The name of the dataset in the cache.
+    - columns (list, optional): The attribute columns to read (default: all).
+    - geometry (bool): Read the geometries. If False, the attributes table is read
+      instead, with the minx, miny, maxx and maxy bounding box columns available.
+
+    Returns:
+    - GeoDataFrame or DataFrame: The dataset.
+    """
+    geometry_path, attributes_path = cache_geodata(source_path, name)
+    if not geometry:
+        return pd.read_parquet(attributes_path, columns=columns, memory_map=True)
+    if columns is not None:
+        columns = list(columns) + ["geometry"]
+    return gpd.read_parquet(geometry_path, columns=columns, memory_map=True)
+
+
+def read_gaul(level, columns=None, geometry=True):
+    """
+    Read the GAUL administrative regions of a level through the cache.
+
+    Parameters:
+    - level (int): The admin level (1 or 2).
+    - columns (list, optional): The attribute columns to read (default: all).
+    - geometry (bool): Read the geometries (see read_cached_geodata).
+
+    Returns:
+    - GeoDataFrame or DataFrame: The GAUL regions.
+    """
+    return read_cached_geodata(
+        get_path(f"gaul{level}_path"), f"gaul{level}", columns, geometry
+    )
+
+
+def read_prepared_gaul(level, columns=None, tolerance=0.005, max_workers=1):
+    """
+    Read the GAUL administrative regions of a level with simplified and fixed geometries
+    (see functions.prepare_geometries). Each region is prepared once, and the prepared
+    geometries are cached for the tolerance until the GAUL file changes.
+
+    Parameters:
+    - level (int): The admin level (1 or 2).
+    - columns (list, optional): The attribute columns to read (default: all).
+    - tolerance (float): The simplification tolerance.
+    - max_workers (int): The number of processes used to prepare the geometries.
+
+    Returns:
+    - GeoDataFrame: The GAUL regions with prepared geometries.
+    """
+    source_path = get_path(f"gaul{level}_path")
+    path = _cache_file(
+        f"gaul{level}", f"prepared{tolerance}", source_fingerprint(source_path)
+    )
+
+    if not os.path.exists(path):
+        print(f"Preparing gaul{level} geometries")
+        gdf = read_gaul(level)
+        gdf["geometry"] = prepare_geometries(gdf.geometry, tolerance, max_workers)
+        _write_parquet(gdf, path)
+
+    if columns is not None:
+        columns = list(columns) + ["geometry"]
+    return gpd.read_parquet(path, columns=columns, memory_map=True)
+
+
+def prepared_gaul_version(tolerance=0.005):
+    """
+    Version of the prepared GAUL geometries of both levels (see read_prepared_gaul):
+    the fingerprints of the GAUL files and the simplification tolerance.
+
+    Returns:
+    - str: The version.
+    """
+    fingerprints = [
+        source_fingerprint(get_path(f"gaul{level}_path")) for level in [1, 2]
+    ]
+    return ":".join(fingerprints + [str(tolerance)])
+
+
+# columns of EM-DAT stored as categoricals
+EMDAT_CATEGORICAL_COLUMNS = [
+    "Historic",
+    "Classification Key",
+    "Disaster Group",
+    "Disaster Subgroup",
+    "Disaster Type",
+    "Disaster Subtype",
+    "ISO",
+    "Country",
+    "Subregion",
+    "Region",
+]
+
+
+def cache_emdat(source_path=None):
+    """
+    Convert the EM-DAT workbook to a typed Parquet file in the cache folder, with
+    DisNo. as index and categorical codes, countries and disaster types.
+    Nothing is done if the cache is up to date with the content of the workbook.
+
+    Parameters:
+    - source_path (str, optional): The EM-DAT workbook (default: emdat_path).
+
+    Returns:
+    - str: The path of the Parquet file.
+    """
+    if source_path is None:
+        source_path = get_path("emdat_path")
+    path = _cache_file("emdat", "table", source_fingerprint(source_path, True))
+
+    if not os.path.exists(path):
+        print(f"Caching {source_path}")
+        emdat = pd.read_excel(source_path).set_index("DisNo.")
+        for col in emdat.columns:
+            if col in EMDAT_CATEGORICAL_COLUMNS:
+                emdat[col] = emdat[col].astype("category")
+            elif emdat[col].dtype == object:
+                # columns mixing numbers and text are stored as text
+                values = emdat[col].dropna()
+                if not values.map(type).eq(str).all():
+                    emdat[col] = emdat[col].where(
+                        emdat[col].isna(), emdat[col].astype(str)
+                    )
+        _write_parquet(emdat, path)
+
+    return path
+
+
+def read_emdat(columns=None, source_path=None):
+    """
+    Read EM-DAT through the Parquet cache (see cache_emdat).
+
+    Parameters:
+    - columns (list, optional): The columns to read (default: all).
+    - source_path (str, optional): The EM-DAT workbook (default: emdat_path).
+
+    Returns:
+    - DataFrame: EM-DAT with DisNo. as index.
+    """
+    emdat = pd.read_parquet(cache_emdat(source_path), columns=columns, memory_map=True)
+    # missing text values are read as None, restore NaN as returned by pd.read_excel
+    text_columns = emdat.select_dtypes(object).columns
+    emdat[text_columns] = emdat[text_columns].where(emdat[text_columns].notna(), np.nan)
+    return emdat
+
+
+def read_event_locations(locations_path, regions_path, events=None):
+    """
+    Read the event locations written in the normalized layout of script 4 (a table of
+    locations and a GeoParquet file of region geometries), reading only the geometries
+    of the regions referenced by the selected events.
+
+    Parameters:
+    - locations_path (str): The Parquet file of the event locations.
+    - regions_path (str): The GeoParquet file of the region geometries.
+    - events (list, optional): The DisNo. of the events to read (default: all).
+
+    Returns:
+    - GeoDataFrame: The event locations with their geometries.
+    """
+    filters = None if events is None else [("DisNo.", "in", list(events))]
+    locations = pd.read_parquet(locations_path, filters=filters)
+    regions = gpd.read_parquet(
+        regions_path,
+        filters=[("ADM_CODE", "in", np.unique(event_region_codes(locations)).tolist())],
+    )
+    return materialize_event_locations(locations, regions)
+
+
+def _normalized_event_files():
+    folder = get_path("geolocated_events_normalized_path")
+    return (
+        os.path.join(folder, "locations.parquet"),
+        os.path.join(folder, "regions.parquet"),
+    )
+
+
+def geolocated_events_layout():
+    """
+    Layout of the geolocated events written by script 4: "normalized", "joined" (GPKG),
+    or None if script 4 has not been run.
+    """
+    if os.path.exists(_normalized_event_files()[0]):
+        return "normalized"
+    if os.path.exists(get_path("geolocated_events_path")):
+        return "joined"
+    return None
+
+
+def read_geolocated_events(events=None):
+    """
+    Read the geolocated events written by script 4, in the layout it was written in.
+
+    Parameters:
+    - events (list, optional): The DisNo. of the events to read (default: all).
+
+    Returns:
+    - GeoDataFrame: The event locations with their geometries.
+    """
+    layout = geolocated_events_layout()
+    if layout == "normalized":
+        return read_event_locations(*_normalized_event_files(), events)
+    if layout is None:
+        raise FileNotFoundError(
+            f"No geolocated events found at {get_path('geolocated_events_path')}"
+        )
+    gdf = gpd.read_file(get_path("geolocated_events_path"))
+    if events is not None:
+        gdf = gdf[gdf["DisNo."].isin(events)].reset_index(drop=True)
+    return gdf
+
+
+def write_geolocated_events(gdf, layout="joined"):
+    """
+    Write the geolocated events of script 4 in a layout ("joined": 1 GPKG with 1 geometry
+    per event location, or "normalized": a table of event locations and a table of
+    deduplicated region geometries), removing the files of the other layout.
+    """
+    locations_path, regions_path = _normalized_event_files()
+    gpkg_path = get_path("geolocated_events_path")
+    if layout == "normalized":
+        locations, regions = normalize_event_locations(gdf)
+        os.makedirs(os.path.dirname(locations_path), exist_ok=True)
+        locations.to_parquet(locations_path)
+        regions.to_parquet(regions_path)
+        if os.path.exists(gpkg_path):
+            os.remove(gpkg_path)
+    else:
+        if os.path.exists(gpkg_path):
+            os.remove(gpkg_path)
+        gdf.to_file(gpkg_path, driver="GPKG")
+        for path in [locations_path, regions_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def event_hashes(df, columns, event_col="DisNo."):
+    """
+    Hash of the rows of each event, for the given columns (independent of the order
+    of the rows), to detect the events that changed between two runs.
+
+    Parameters:
+    - df (DataFrame): The rows of the events.
+    - columns (list): The columns to hash.
+    - event_col (str): The column (or index level) identifying the events.
+
+    Returns:
+    - Series: The hash of each event (hexadecimal str), indexed by event.
+    """
+    if event_col in df.index.names:
+        df = df.reset_index()
+    row_hashes = pd.util.hash_pandas_object(
+        df[columns].astype(str), index=False
+    ).to_numpy()
+    events, event_index = np.unique(df[event_col].to_numpy(), return_inverse=True)
+    # sum of the row hashes of each event (modulo 2**64)
+    sums = np.zeros(len(events), dtype=np.uint64)
+    np.add.at(sums, event_index, row_hashes)
+    return pd.Series(
+        [f"{h:016x}" for h in sums], index=pd.Index(events, name=event_col)
+    )
+
+
+def _snapshot_file(name):
+    snapshot_dir = get_path("delta_snapshot_path")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    return os.path.join(snapshot_dir, f"{name}.parquet")
+
+
+def read_event_snapshot(name):
+    """
+    Read the event hashes recorded by the last run of a script (None if there is none).
+    """
+    path = _snapshot_file(name)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)["hash"]
+
+
+def write_event_snapshot(name, hashes):
+    """
+    Record the event hashes of a run of a script (see event_hashes), once its outputs
+    are written.
+    """
+    path = _snapshot_file(name)
+    tmp_path = path + ".tmp"
+    hashes.rename("hash").to_frame().to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def changed_events(hashes, snapshot):
+    """
+    Compare the event hashes of the current inputs to those of the last run.
+
+    Parameters:
+    - hashes (Series): The current event hashes.
+    - snapshot (Series or None): The event hashes of the last run (None: no previous run).
+
+    Returns:
+    - tuple: The events that are new or changed (Index), and the events that were
+      removed (Index).
+    """
+    if snapshot is None:
+        return hashes.index, pd.Index([], name=hashes.index.name)
+    previous = snapshot.reindex(hashes.index)
+    updated = hashes.index[previous.isna() | (previous != hashes)]
+    removed = snapshot.index.difference(hashes.index)
+    return updated, removed
@@ -8,6 +8,13 @@ DATA_PATHS = {
     # GAUL geolocation maps
     "gaul1_path": "/net/projects/xaida/raw_data/gaul_maps/gaul_admin1_clean.gpkg",
     "gaul2_path": "/net/projects/xaida/raw_data/gaul_maps/gaul_admin2_clean.gpkg",
+    # GeoNames dump (allCountries.txt or per-country <ISO2>.txt) and admin 1 names
+    "geonames_dump_path": "/net/projects/xaida/raw_data/geonames/allCountries.txt",
+    "geonames_admin1_path": "/net/projects/xaida/raw_data/geonames/admin1CodesASCII.txt",
+    # offline GeoNames gazetteer built from the dump
+    "geonames_gazetteer_path": "/net/projects/xaida/database_paper/intermediate_data/geonames_gazetteer.sqlite",
+    # cache of geocoding results
+    "geocoding_cache_path": "/net/projects/xaida/database_paper/intermediate_data/geocoding_cache.sqlite",
     # Locations to identify with GeoNames
     "df_locations_path": "/net/projects/xaida/database_paper/intermediate_data/event_locations_to_geolocate.csv",
     # manually corrected locations
@@ -18,16 +25,36 @@ DATA_PATHS = {
     "corrected_locations_path": "/net/projects/xaida/database_paper/intermediate_data/corrected_locations/",
     # Geonames locations cleaned
     "geonames_locations_clean_path": "/net/projects/xaida/database_paper/intermediate_data/name_locations_identified_clean.csv",
+    # geolocated events (script 4)
+    "geolocated_events_path": "/net/projects/xaida/database_paper/intermediate_data/geolocated_climate_events_1990-2023_simplified_clean.gpkg",
+    # geolocated events in the normalized layout of script 4 (locations and regions tables)
+    "geolocated_events_normalized_path": "/net/projects/xaida/database_paper/intermediate_data/geolocated_climate_events_1990-2023_normalized/",
+    # national overlay of the geolocated events (script 5)
+    "national_overlay_path": "/net/projects/xaida/database_paper/intermediate_data/geolocated_climate_events_1990-2023_national_clean.gpkg",
     # geocoded locations no overlay
     "geocoded_locations_path": "/net/projects/xaida/database_paper/output_data/disaster_subnational_90_23.gpkg",
     # geocodded locations national overlay
     "geocoded_national_path": "/net/projects/xaida/database_paper/output_data/disaster_national_90_23.gpkg",
     # GDIS database
     "gdis_data_path": "/net/scratch/kteber/reproduce_studies/GDIS_paper_data/pend-gdis-1960-2018-disasterlocations.gpkg",
+    # comparison of the geocoded events to GDIS (script 7)
+    "gdis_comparison_path": "/net/projects/xaida/database_paper/output_data/geodat_gdis_comaprison_qflags.csv",
+    # state of the pipeline runner (fingerprints of the stage inputs and outputs)
+    "pipeline_state_path": "/net/projects/xaida/database_paper/intermediate_data/pipeline_state.json",
     # GDIS simplified
     "gdis_simplified_path": "/net/projects/xaida/database_paper/intermediate_data/simplified_gdis.gpkg",
     # Path to save intermediate data
     "intermediate_data_path": "/net/projects/xaida/database_paper/intermediate_data/",
+    # cache of the unions of sets of regions (national overlay)
+    "union_cache_path": "/net/projects/xaida/database_paper/intermediate_data/union_cache.sqlite",
+    # event hashes of the last run of the scripts (incremental updates)
+    "delta_snapshot_path": "/net/projects/xaida/database_paper/intermediate_data/delta_snapshots/",
+    # manual corrections of the geocoded locations (versioned with the code)
+    "manual_corrections_path": os.path.join(
+        BASE_DIR, "utils", "manual_corrections.csv"
+    ),
+    # Path to cache converted input data (GeoParquet, Parquet)
+    "cache_path": "/net/projects/xaida/database_paper/intermediate_data/cache/",
     # Path to save clean data
     "clean_data_path": "/net/projects/xaida/database_paper/output_data/",
 }
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+# Add the src directory to the Python path, as the scripts do
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import utils.functions as functions
+
+
+def test_prepare_geometries_keeps_input_unchanged():
+    # self-intersecting polygon (bow tie), fixed by prepare_geometries
+    bow_tie = shapely.Polygon([(0, 0), (1, 1), (1, 0), (0, 1)])
+    geometries = gpd.GeoSeries([bow_tie, shapely.box(0, 0, 1, 1)])
+
+    for tolerance in [0, None]:
+        prepared = functions.prepare_geometries(geometries, tolerance=tolerance)
+        assert list(prepared.is_valid) == [True, True]
+        assert list(geometries.is_valid) == [False, True]
+        assert geometries.iloc[0].equals_exact(bow_tie, 0)
+
+
+def test_explode_parts_drops_missing_values():
+    df = pd.DataFrame(
+        {"DisNo.": ["a", "b", "c", "d"], "Location": ["x, y", np.nan, "z", np.nan]}
+    )
+
+    exploded = functions.explode_parts(
+        df, "Location", lambda value: value.split(", "), "part"
+    )
+    assert exploded["DisNo."].tolist() == ["a", "a", "c"]
+    assert exploded["part"].tolist() == ["x", "y", "z"]
+
+    missing = functions.explode_parts(
+        df[df["Location"].isna()], "Location", lambda value: value.split(", "), "part"
+    )
+    assert len(missing) == 0
+
+
+def test_dissolve_events_keeps_the_columns_of_dissolve():
+    gdf = gpd.GeoDataFrame(
+        {
+            "DisNo.": ["a", "a", "b"],
+            "admin_level": [1, 2, 1],
+            "ISO": ["FRA", "FRA", "DEU"],
+            "Location": ["x", "y", "z"],
+        },
+        geometry=[
+            shapely.box(0, 0, 1, 1),
+            shapely.box(1, 0, 2, 1),
+            shapely.box(0, 0, 1, 1),
+        ],
+        crs="EPSG:4326",
+    )
+    # aggregations given in another order than the columns of the frame
+    aggfunc = {"ISO": "first", "Location": "join", "admin_level": "join"}
+    join = lambda x: " - ".join(np.unique(x.astype(str)))
+
+    dissolved = functions.dissolve_events(gdf, "DisNo.", aggfunc)
+    expected = gdf.dissolve(
+        by="DisNo.",
+        aggfunc={
+            "ISO": lambda x: np.unique(x)[0],
+            "Location": join,
+            "admin_level": join,
+        },
+    )
+    assert list(dissolved.columns) == list(expected.columns)
+    assert dissolved.drop(columns="geometry").equals(expected.drop(columns="geometry"))
+    assert dissolved.geom_equals(expected.geometry).all()